@@ -0,0 +1,96 @@
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from app.api.deps import require_admin
+from app.services.profiling import memory_profiler, sampling_profiler
+
+
+router = APIRouter(
+    prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)]
+)
+
+
+def _profile_response(folded: str) -> PlainTextResponse:
+    # Counts in the folded stacks only make sense with the number of samples and the duration
+    return PlainTextResponse(
+        folded,
+        headers={
+            "X-Profile-Samples": str(sampling_profiler.samples),
+            "X-Profile-Duration": f"{sampling_profiler.duration:.3f}",
+        },
+    )
+
+
+@router.post("/profiler/start")
+async def start_profiler(
+    seconds: float = Query(default=30, gt=0, le=600),
+    interval: float = Query(default=0.005, ge=0.001, le=1),
+):
+    """
+    Starts the sampling profiler. It stops by itself after `seconds`.
+    """
+    try:
+        sampling_profiler.start(seconds=seconds, interval=interval)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": "started", "seconds": seconds}
+
+
+@router.post("/profiler/stop", response_class=PlainTextResponse)
+async def stop_profiler():
+    """
+    Stops the profiler and returns folded stacks (flamegraph.pl / speedscope).
+    The number of samples and the duration in seconds are in the X-Profile-* headers.
+    """
+    return _profile_response(await asyncio.to_thread(sampling_profiler.stop))
+
+
+@router.get("/profiler/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(default=10, gt=0, le=120),
+    interval: float = Query(default=0.005, ge=0.001, le=1),
+):
+    """
+    Profiles the service for `seconds` and returns folded stacks.
+    """
+    try:
+        sampling_profiler.start(seconds=seconds, interval=interval)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    await asyncio.sleep(seconds)
+    return _profile_response(await asyncio.to_thread(sampling_profiler.stop))
+
+
+@router.post("/memory/snapshot")
+async def memory_snapshot(
+    frames: int = Query(default=1, ge=1, le=50),
+    limit: int = Query(default=20, ge=1, le=200),
+):
+    """
+    Enables tracemalloc (if needed) and saves a baseline snapshot.
+    """
+    # take_snapshot() on a large heap takes seconds, keep it off the event loop
+    return await asyncio.to_thread(memory_profiler.snapshot, frames=frames, limit=limit)
+
+
+@router.get("/memory/diff")
+async def memory_diff(
+    path: Optional[str] = None, limit: int = Query(default=20, ge=1, le=200)
+):
+    """
+    Memory growth since the baseline, e.g. ?path=app/services to look at the parsers only.
+    """
+    try:
+        return await asyncio.to_thread(memory_profiler.diff, path=path, limit=limit)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.delete("/memory")
+async def memory_stop():
+    """
+    Disables tracemalloc, so there is no overhead anymore.
+    """
+    memory_profiler.stop()
+    return {"status": "stopped"}
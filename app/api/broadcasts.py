@@ -0,0 +1,73 @@
+from datetime import date
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from app.api.deps import get_broadcaster, require_admin
+from app.services.candidates import candidate_store
+from app.services.delivery import Broadcaster
+
+
+router = APIRouter(
+    prefix="/admin/broadcasts",
+    tags=["broadcasts"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+class BroadcastRequest(BaseModel):
+    text: str = Field(min_length=1, max_length=4096)
+    # Explicit recipients. If not set, candidates are selected by the filters below
+    chat_ids: Optional[List[int]] = None
+    skill: Optional[str] = None
+    verdict: Optional[Literal["accepted", "rejected", "pending"]] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+
+
+@router.post("", status_code=202)
+async def create_broadcast(
+    request: BroadcastRequest, broadcaster: Broadcaster = Depends(get_broadcaster)
+):
+    """
+    Queues a message to a pool of candidates, e.g. about a new vacancy.
+    """
+    chat_ids = request.chat_ids
+    if chat_ids is None:
+        chat_ids = await candidate_store.select_user_ids(
+            skill=request.skill,
+            verdict=request.verdict,
+            date_from=request.date_from,
+            date_to=request.date_to,
+        )
+    if not chat_ids:
+        raise HTTPException(status_code=400, detail="No recipients")
+
+    broadcast_id = await broadcaster.create(request.text, chat_ids)
+    return await broadcaster.get_progress(broadcast_id)
+
+
+@router.get("/{broadcast_id}")
+async def get_broadcast(
+    broadcast_id: str, broadcaster: Broadcaster = Depends(get_broadcaster)
+):
+    """
+    Progress and throughput (messages per second) of a broadcast.
+    """
+    progress = await broadcaster.get_progress(broadcast_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Broadcast not found")
+    return progress
+
+
+@router.delete("/{broadcast_id}")
+async def cancel_broadcast(
+    broadcast_id: str, broadcaster: Broadcaster = Depends(get_broadcaster)
+):
+    progress = await broadcaster.get_progress(broadcast_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Broadcast not found")
+    if not await broadcaster.cancel(broadcast_id):
+        raise HTTPException(
+            status_code=409, detail=f"Broadcast is already {progress['status']}"
+        )
+    return await broadcaster.get_progress(broadcast_id)
@@ -0,0 +1,33 @@
+from datetime import date
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from app.api.deps import require_admin
+from app.services.candidates import candidate_store
+
+
+router = APIRouter(
+    prefix="/candidates", tags=["candidates"], dependencies=[Depends(require_admin)]
+)
+
+
+@router.get("")
+async def list_candidates(
+    skill: Optional[str] = None,
+    verdict: Optional[Literal["accepted", "rejected", "pending"]] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    cursor: Optional[int] = Query(default=None, ge=1),
+    limit: int = Query(default=50, ge=1, le=200),
+):
+    """
+    Candidates, newest first. Pass `next_cursor` from the response to get the next page.
+    """
+    items, next_cursor = await candidate_store.query(
+        skill=skill,
+        verdict=verdict,
+        date_from=date_from,
+        date_to=date_to,
+        cursor=cursor,
+        limit=limit,
+    )
+    return {"items": items, "next_cursor": next_cursor}
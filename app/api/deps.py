@@ -0,0 +1,22 @@
+import secrets
+from typing import Optional
+from fastapi import Header, HTTPException, Request
+from app.config import settings
+from app.services.delivery import Broadcaster
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Protects internal endpoints with the X-Admin-Token header.
+    If ADMIN_TOKEN is not configured, the endpoints are disabled.
+    """
+    if settings.ADMIN_TOKEN is None:
+        raise HTTPException(status_code=403, detail="Admin API is disabled")
+
+    expected = settings.ADMIN_TOKEN.get_secret_value()
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+def get_broadcaster(request: Request) -> Broadcaster:
+    return request.app.state.broadcaster
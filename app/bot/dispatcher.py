@@ -0,0 +1,21 @@
+from aiogram import Dispatcher
+from aiogram.fsm.storage.base import BaseStorage
+from app.bot.handlers import router
+from app.bot.middlewares import AdmissionMiddleware, RecordingMiddleware
+from app.services.load import LoadMonitor
+from app.services.recording import Recorder
+
+
+def create_dispatcher(
+    storage: BaseStorage, monitor: LoadMonitor, recorder: Recorder = None
+) -> Dispatcher:
+    """
+    The bot's dispatcher with its middlewares and handlers.
+    The handlers router can be attached only once per process.
+    """
+    dp = Dispatcher(storage=storage)
+    dp.message.middleware(AdmissionMiddleware(monitor))
+    if recorder is not None:
+        dp.update.outer_middleware(RecordingMiddleware(recorder))
+    dp.include_router(router)
+    return dp
@@ -4,7 +4,9 @@ from aiogram.filters import CommandStart
 from aiogram.types import Message, ReplyKeyboardRemove
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
+from app.config import settings
 from app.services.ai import ai_service
+from app.services.candidates import candidate_store
 from app.services.parser import content_parser
 from app.bot.keyboards import kb_contact, kb_vacancies, kb_cancel
 
@@ -33,6 +35,35 @@ REJECT_MESSAGE_INSTRUCTION = (
     "but we'll save their resume in our database."
 )
 
+UNSUPPORTED_FILE_MESSAGE = (
+    "Please send your resume as a **PDF, DOCX, RTF, TXT or HTML** file."
+)
+
+
+def get_verdict(ai_response: str) -> str:
+    """
+    The AI gives the test task link only to suitable candidates.
+    If no model answered (a template reply), the resume is not analyzed yet.
+    """
+    if getattr(ai_response, "is_fallback", False):
+        return "pending"
+    return "accepted" if TEST_TASK_LINK in ai_response else "rejected"
+
+
+async def save_candidate(
+    message: Message, state: FSMContext, source: str, ai_response: str
+):
+    data = await state.get_data()
+    await candidate_store.save(
+        user_id=message.from_user.id,
+        first_name=data.get("first_name"),
+        last_name=data.get("last_name"),
+        phone=data.get("phone"),
+        source=source,
+        verdict=get_verdict(ai_response),
+        resume_text=data.get("resume_text", ""),
+    )
+
 
 @router.message(CommandStart())
 async def cmd_start(message: Message, state: FSMContext):
@@ -76,7 +107,7 @@ async def vacancy_python(message: Message, state: FSMContext):
     await message.answer(
         "Great choice! We're looking for a Middle Developer for the following stacks: **FastAPI, Redis, PostgreSQL**.\n\n"
         "Send me your resume in one of the following ways:\n"
-        "1. **As a PDF file**\n"
+        "1. **As a file** (PDF, DOCX, RTF, TXT or HTML)\n"
         "2. **As a link** to HH.ru or LinkedIn (format https://hh.ru/resume/...)\n\n"
         "I'll analyze it and tell you what to do next.",
         reply_markup=kb_cancel,
@@ -91,25 +122,43 @@ async def back_to_start(message: Message, state: FSMContext):
 
 
 @router.message(RecruitState.waiting_resume, F.document)
-async def handle_resume_pdf(message: Message, bot: Bot, state: FSMContext):
-    if message.document.mime_type != "application/pdf":
-        await message.answer("Please send your resume in **PDF** format.")
+async def handle_resume_document(message: Message, bot: Bot, state: FSMContext):
+    document = message.document
+    if not content_parser.may_be_supported(document.mime_type):
+        await message.answer(UNSUPPORTED_FILE_MESSAGE)
+        return
+    if (document.file_size or 0) > settings.RESUME_MAX_FILE_SIZE:
+        await message.answer(
+            f"The file is too large. Please send a resume up to "
+            f"{settings.RESUME_MAX_FILE_SIZE // (1024 * 1024)} MB or a link."
+        )
         return
 
     wait_msg = await message.answer("I'm downloading and reading your resume... ⏳")
 
+    # The MIME type and the name are often wrong, the content decides
+    file_bytes = (await bot.download(document)).read()
+    if (
+        content_parser.detect_format(file_bytes, document.mime_type, document.file_name)
+        is None
+    ):
+        await wait_msg.edit_text(UNSUPPORTED_FILE_MESSAGE)
+        return
+
     # Parsing
-    file = await bot.download(message.document)
-    text = await content_parser.extract_text_from_pdf(file.read())
+    text = await content_parser.extract_text_from_document(
+        file_bytes, mime_type=document.mime_type, file_name=document.file_name
+    )
 
     if not text or len(text) < 50:
         await wait_msg.edit_text(
-            "Unable to read text from PDF. It may be a scan (image). Please send a text PDF or a link."
+            "Unable to read text from the file. It may be a scan (image). Please send a text document or a link."
         )
         return
 
     # Saving context
-    await state.update_data(resume_text=text[:4000])
+    text = text[: settings.RESUME_CONTEXT_LIMIT]
+    await state.update_data(resume_text=text)
 
     # AI Analyze. Creating a special prompt for this step.
     analysis_prompt = (
@@ -120,12 +169,14 @@ async def handle_resume_pdf(message: Message, bot: Bot, state: FSMContext):
 
     ai_response = await ai_service.generate_response(
         user_text="Here's my resume. It's ok?",
-        context=text[:4000],
+        context=text,
         custom_system_prompt=analysis_prompt,  # Important: override the system prompt or supplement it.
+        tier="strong",
     )
 
     await wait_msg.delete()
     await message.answer(ai_response, reply_markup=ReplyKeyboardRemove())
+    await save_candidate(message, state, source="file", ai_response=ai_response)
 
     # Switch to "chat" mode so that the candidate can ask questions about the test
     await state.set_state(RecruitState.chatting)
@@ -140,11 +191,12 @@ async def handle_resume_link(message: Message, state: FSMContext):
 
     if not text:
         await wait_msg.edit_text(
-            "I couldn't open the link (the profile might be private). It's better to send me the PDF file."
+            "I couldn't open the link (the profile might be private). It's better to send me the file."
         )
         return
 
-    await state.update_data(resume_text=text[:4000])
+    text = text[: settings.RESUME_CONTEXT_LIMIT]
+    await state.update_data(resume_text=text)
 
     analysis_prompt = (
         f"Analyze the candidate's profile using the link.\n"
@@ -154,16 +206,18 @@ async def handle_resume_link(message: Message, state: FSMContext):
 
     ai_response = await ai_service.generate_response(
         user_text=f"Here's a link to my resume: {url}. It's ok?",
-        context=text[:4000],
+        context=text,
         custom_system_prompt=analysis_prompt,
+        tier="strong",
     )
 
     await wait_msg.delete()
     await message.answer(ai_response, reply_markup=ReplyKeyboardRemove())
+    await save_candidate(message, state, source="link", ai_response=ai_response)
     await state.set_state(RecruitState.chatting)
 
 
-@router.message()
+@router.message(flags={"priority": "low"})
 async def handle_any_text(message: Message, state: FSMContext):
     """
     FREE COMMUNICATION (AI Chat)
@@ -183,7 +237,7 @@ async def handle_any_text(message: Message, state: FSMContext):
             "The candidate is at the resume submission stage, but instead of a file or link, they asked a question."
             "Your task:\n"
             "1. Answer their question briefly.\n"
-            "2. Gently remind them that we need the resume (PDF or link) to proceed."
+            "2. Gently remind them that we need the resume (file or link) to proceed."
         )
         ai_answer = await ai_service.generate_response(
             user_text=message.text,
@@ -0,0 +1,58 @@
+import logging
+from typing import Any, Awaitable, Callable, Dict
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import Message, Update
+from app.services.load import LoadMonitor
+from app.services.recording import Recorder
+
+
+logger = logging.getLogger(__name__)
+
+BUSY_MESSAGE = (
+    "I'm getting a lot of messages right now ⏳ Please try again in a minute."
+)
+
+
+class AdmissionMiddleware(BaseMiddleware):
+    """
+    Counts handlers in progress and sheds low-priority ones when the bot is overloaded.
+    A handler is low-priority if it's registered with flags={"priority": "low"}.
+    """
+
+    def __init__(self, monitor: LoadMonitor):
+        self.monitor = monitor
+
+    async def __call__(
+        self,
+        handler: Callable[[Message, Dict[str, Any]], Awaitable[Any]],
+        event: Message,
+        data: Dict[str, Any],
+    ) -> Any:
+        if get_flag(data, "priority") == "low" and self.monitor.overloaded:
+            self.monitor.shed += 1
+            logger.warning(f"Overloaded, shedding update from {event.chat.id}")
+            await event.answer(BUSY_MESSAGE)
+            return None
+
+        async with self.monitor.track():
+            return await handler(event, data)
+
+
+class RecordingMiddleware(BaseMiddleware):
+    """
+    Outer middleware on updates: writes every incoming update to the recorder.
+    Registered only when recording is enabled.
+    """
+
+    def __init__(self, recorder: Recorder):
+        self.recorder = recorder
+
+    async def __call__(
+        self,
+        handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any],
+    ) -> Any:
+        self.recorder.record_update(event.model_dump(mode="json", exclude_none=True))
+        return await handler(event, data)
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Optional
 from pydantic import SecretStr
 
 
@@ -10,6 +11,45 @@ class Settings(BaseSettings):
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
 
+    # How much of the resume text is kept and sent to the AI
+    RESUME_CONTEXT_LIMIT: int = 4000
+    # Bigger files are not downloaded (Telegram gives bots up to 20 MB anyway)
+    RESUME_MAX_FILE_SIZE: int = 10 * 1024 * 1024
+
+    # AI model routing
+    AI_FAST_MODEL: str = "gemini-2.5-flash-lite"
+    AI_STRONG_MODEL: str = "gemini-2.5-flash"
+    AI_REQUEST_TIMEOUT: float = 30.0
+    AI_HEDGE_PERCENTILE: float = 0.95
+    AI_HEDGE_DEFAULT_DELAY: float = 5.0
+    AI_BREAKER_FAILURES: int = 5
+    AI_BREAKER_RESET: float = 30.0
+
+    # Admission control
+    LOAD_MAX_LOOP_LAG: float = 0.5
+    LOAD_MAX_IN_FLIGHT: int = 50
+    SHUTDOWN_DRAIN_TIMEOUT: float = 20.0
+
+    # Candidate database
+    CANDIDATES_DB_PATH: str = "data/candidates.sqlite3"
+    CANDIDATES_BATCH_SIZE: int = 100
+    CANDIDATES_FLUSH_INTERVAL: float = 1.0
+    CANDIDATES_WRITE_RETRIES: int = 3
+    # Batches that could not be written after the retries go here as JSON lines
+    CANDIDATES_FAILED_PATH: str = "data/candidates.failed.jsonl"
+
+    # Broadcasts (Telegram allows ~30 msg/s per bot, 1 msg/s per chat, 20 msg/min per group)
+    BROADCAST_RATE: float = 25.0
+    BROADCAST_CHAT_INTERVAL: float = 1.0
+    BROADCAST_GROUP_INTERVAL: float = 3.0
+    BROADCAST_CONCURRENCY: int = 10
+
+    # Path of a traffic recording for replay tests (off if empty)
+    RECORD_PATH: Optional[str] = None
+
+    # Token for the /candidates and /admin endpoints (disabled if empty)
+    ADMIN_TOKEN: Optional[SecretStr] = None
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
 
@@ -3,11 +3,21 @@ import logging
 from app.log_config import setup_logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from aiogram import Bot, Dispatcher
+from fastapi.responses import JSONResponse
+from aiogram import Bot
 from aiogram.fsm.storage.redis import RedisStorage
 from redis.asyncio import Redis
 from app.config import settings
-from app.bot.handlers import router
+from app.api.admin import router as admin_router
+from app.api.broadcasts import router as broadcasts_router
+from app.api.candidates import router as candidates_router
+from app.bot.keyboards import kb_cancel, kb_contact, kb_vacancies
+from app.bot.dispatcher import create_dispatcher
+from app.services.ai import ai_service
+from app.services.candidates import candidate_store
+from app.services.delivery import Broadcaster
+from app.services.load import load_monitor
+from app.services.recording import recorder
 
 
 setup_logging()
@@ -18,9 +28,18 @@ redis = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, decode_respons
 storage = RedisStorage(redis=redis)
 
 bot = Bot(token=settings.BOT_TOKEN.get_secret_value())
-dp = Dispatcher(storage=storage)
+dp = create_dispatcher(
+    storage, load_monitor, recorder=recorder if settings.RECORD_PATH else None
+)
 
-dp.include_router(router)
+broadcaster = Broadcaster(
+    redis,
+    bot,
+    rate=settings.BROADCAST_RATE,
+    chat_interval=settings.BROADCAST_CHAT_INTERVAL,
+    group_interval=settings.BROADCAST_GROUP_INTERVAL,
+    concurrency=settings.BROADCAST_CONCURRENCY,
+)
 
 
 @asynccontextmanager
@@ -30,16 +49,51 @@ async def lifespan(app: FastAPI):
     """
     logger.info("Starting up bot polling...")
 
-    polling_task = asyncio.create_task(dp.start_polling(bot))
+    if settings.RECORD_PATH:
+        # Button texts are kept in the recording, handlers are routed by them
+        buttons = [
+            button.text
+            for keyboard in (kb_contact, kb_vacancies, kb_cancel)
+            for row in keyboard.keyboard
+            for button in row
+        ]
+        recorder.start(settings.RECORD_PATH, keep_texts=buttons)
+
+    await candidate_store.start()
+    load_monitor.start()
+    # Signals are handled by uvicorn, and the session is closed below, after the drain
+    polling_task = asyncio.create_task(
+        dp.start_polling(bot, handle_signals=False, close_bot_session=False)
+    )
+    await broadcaster.start()
     yield
 
     logger.info("Shutting down...")
 
-    polling_task.cancel()
+    # Unsent chats stay in Redis, the broadcast continues after the restart
+    await broadcaster.stop()
+
+    # Stop fetching new updates, but let the handlers in progress answer
+    try:
+        await dp.stop_polling()
+    except RuntimeError:
+        polling_task.cancel()
     try:
         await polling_task
     except asyncio.CancelledError:
-        logger.info("Bot polling stopped gracefully")
+        pass
+    logger.info("Bot polling stopped gracefully")
+
+    # Updates spawned by polling may not have reached the handlers yet.
+    # aiogram has no public handle on these tasks
+    if await load_monitor.drain(
+        timeout=settings.SHUTDOWN_DRAIN_TIMEOUT, tasks=dp._handle_update_tasks
+    ):
+        logger.info("All handlers finished")
+
+    await load_monitor.stop()
+    await candidate_store.stop()
+    recorder.stop()
 
     await bot.session.close()
 
@@ -55,6 +109,12 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+app.state.broadcaster = broadcaster
+
+app.include_router(admin_router)
+app.include_router(broadcasts_router)
+app.include_router(candidates_router)
+
 
 @app.get("/health", status_code=200)
 async def health_check():
@@ -68,3 +128,20 @@ async def health_check():
         redis_status = "down"
 
     return {"status": "ok", "bot_mode": "polling", "redis": redis_status}
+
+
+@app.get("/ready", status_code=200)
+async def readiness_check():
+    """
+    Returns 503 while the bot is overloaded or shutting down.
+    """
+    status_code = 200 if load_monitor.ready else 503
+    return JSONResponse(load_monitor.as_dict(), status_code=status_code)
+
+
+@app.get("/metrics/ai", status_code=200)
+async def ai_metrics():
+    """
+    Latency, hedging, fallbacks and cost for each model tier.
+    """
+    return ai_service.get_stats()
@@ -1,6 +1,12 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Optional
 import google.generativeai as genai
 from app.config import settings
-import logging
+from app.services.recording import recorder
 
 
 logger = logging.getLogger(__name__)
@@ -30,17 +36,201 @@ Your main goal is the primary screening of candidates.
 """
 
 
+# USD per 1M tokens (input, output). Unknown models are counted as free.
+MODEL_PRICING = {
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-pro": (1.25, 10.00),
+}
+
+FALLBACK_REPLY = "My neurons are confused. Let's try again?"
+
+
+class AIReply(str):
+    """
+    The answer text. is_fallback is True if no model answered
+    and the text is a template, so it says nothing about the candidate.
+    """
+
+    is_fallback = False
+
+
+def template_reply(text: str) -> AIReply:
+    reply = AIReply(text)
+    reply.is_fallback = True
+    return reply
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a model after a series of failures.
+    After `reset_timeout` seconds one probe request is let through (half-open).
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == "half_open" and not self.probing:
+            # Only one probe at a time, the others wait until it succeeds
+            self.probing = True
+            return True
+        return state == "closed"
+
+    def release_probe(self):
+        """
+        The probe ended without a result (cancelled), the next request may probe.
+        """
+        self.probing = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+
+class TierStats:
+    """
+    Rolling latency window and cost counters of a single tier.
+    """
+
+    def __init__(self, window: int = 200):
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.hedged = 0
+        self.fallbacks = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost_usd = 0.0
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)
+        return ordered[max(index, 0)]
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "hedged": self.hedged,
+            "fallbacks": self.fallbacks,
+            "latency_p50": self.percentile(0.5),
+            "latency_p95": self.percentile(0.95),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+        }
+
+
+class ModelTier:
+    """
+    A Gemini model with its own circuit breaker and statistics.
+    If the tier is unavailable, the request goes to `fallback` (another tier),
+    and if there is none, the candidate gets `fallback_reply`.
+    """
+
+    # Hedging on a percentile of 2-3 samples is just noise
+    MIN_SAMPLES_FOR_HEDGE = 20
+
+    def __init__(
+        self,
+        name: str,
+        model_name: str,
+        fallback: Optional["ModelTier"] = None,
+        fallback_reply: str = FALLBACK_REPLY,
+    ):
+        self.name = name
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        self.fallback = fallback
+        self.fallback_reply = fallback_reply
+        self.breaker = CircuitBreaker(
+            settings.AI_BREAKER_FAILURES, settings.AI_BREAKER_RESET
+        )
+        self.stats = TierStats()
+
+    def hedge_delay(self) -> float:
+        if len(self.stats.latencies) < self.MIN_SAMPLES_FOR_HEDGE:
+            return settings.AI_HEDGE_DEFAULT_DELAY
+        return self.stats.percentile(settings.AI_HEDGE_PERCENTILE)
+
+    def record_usage(self, response):
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None:
+            return
+        input_tokens = getattr(usage, "prompt_token_count", 0) or 0
+        output_tokens = getattr(usage, "candidates_token_count", 0) or 0
+        input_price, output_price = MODEL_PRICING.get(self.model_name, (0.0, 0.0))
+
+        self.stats.input_tokens += input_tokens
+        self.stats.output_tokens += output_tokens
+        self.stats.cost_usd += (
+            input_tokens * input_price + output_tokens * output_price
+        ) / 1_000_000
+
+    def as_dict(self) -> dict:
+        return {
+            "model": self.model_name,
+            "breaker": self.breaker.state,
+            "hedge_delay": self.hedge_delay(),
+            **self.stats.as_dict(),
+        }
+
+
 class AIService:
+    """
+    Routes requests between model tiers:
+    - "fast": a cheap model for free chat
+    - "strong": a smarter model for resume analysis, falls back to "fast"
+    """
+
     def __init__(self):
         genai.configure(api_key=settings.GOOGLE_API_KEY.get_secret_value())
-        self.model = genai.GenerativeModel("gemini-2.5-flash")
+        fast = ModelTier("fast", settings.AI_FAST_MODEL)
+        strong = ModelTier(
+            "strong",
+            settings.AI_STRONG_MODEL,
+            fallback=fast,
+            fallback_reply=(
+                "I've received your resume, but I can't analyze it right now. "
+                "Please write to me in a few minutes."
+            ),
+        )
+        self.tiers = {tier.name: tier for tier in (fast, strong)}
 
     async def generate_response(
-        self, user_text: str, context: str = "", custom_system_prompt: str = None
-    ) -> str:
+        self,
+        user_text: str,
+        context: str = "",
+        custom_system_prompt: str = None,
+        tier: str = "fast",
+    ) -> AIReply:
         """
         user_text: user message
         context: for example, the text of the resume, if it was sent earlier
+        tier: "fast" for small talk, "strong" for resume analysis
         """
         current_system_prompt = (
             custom_system_prompt if custom_system_prompt else SYSTEM_PROMPT
@@ -53,12 +243,88 @@ class AIService:
 
         prompt += f"CANDIDATE'S MESSAGE: {user_text}"
 
+        model_tier = self.tiers[tier]
+        while model_tier is not None:
+            if not model_tier.breaker.allow_request():
+                logger.warning(f"Circuit breaker of tier '{model_tier.name}' is open")
+            else:
+                try:
+                    text = await self._call_hedged(model_tier, prompt)
+                    model_tier.breaker.record_success()
+                    return AIReply(text)
+                except asyncio.CancelledError:
+                    model_tier.breaker.release_probe()
+                    raise
+                except Exception as e:
+                    model_tier.stats.errors += 1
+                    model_tier.breaker.record_failure()
+                    logger.error(f"AI Error ({model_tier.model_name}): {e}")
+
+            if model_tier.fallback is None:
+                break
+            model_tier.stats.fallbacks += 1
+            model_tier = model_tier.fallback
+
+        return template_reply(self.tiers[tier].fallback_reply)
+
+    async def _call_hedged(self, model_tier: ModelTier, prompt: str) -> str:
+        """
+        Sends the request and, if there is no answer after the tier's latency percentile,
+        sends a second identical one. The first successful answer wins.
+        """
+        pending = {asyncio.create_task(self._call_model(model_tier, prompt))}
+        error = None
+
+        # Everything is inside try: if the caller is cancelled (shutdown, a cancelled
+        # handler), no request to Gemini keeps running in the background
+        try:
+            done, _ = await asyncio.wait(pending, timeout=model_tier.hedge_delay())
+            if not done:
+                logger.info(f"Hedging slow request to {model_tier.model_name}")
+                model_tier.stats.hedged += 1
+                pending.add(asyncio.create_task(self._call_model(model_tier, prompt)))
+
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+            # The breaker probe is over only when its requests are
+            if pending:
+                await asyncio.wait(pending)
+
+        raise error
+
+    async def _call_model(self, model_tier: ModelTier, prompt: str) -> str:
+        model_tier.stats.requests += 1
+        started = time.perf_counter()
+
         try:
-            response = await self.model.generate_content_async(prompt)
-            return response.text
-        except Exception as e:
-            logging.error(f"AI Error: {e}")
-            return "My neurons are confused. Let's try again?"
+            response = await asyncio.wait_for(
+                model_tier.model.generate_content_async(prompt),
+                timeout=settings.AI_REQUEST_TIMEOUT,
+            )
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            # Timed out or lost to a hedge: without these the window forgets
+            # the slow tail and hedge_delay keeps shrinking
+            model_tier.stats.latencies.append(time.perf_counter() - started)
+            raise
+        text = response.text
+        latency = time.perf_counter() - started
+
+        model_tier.stats.latencies.append(latency)
+        model_tier.record_usage(response)
+        recorder.record_ai(model_tier.name, text, latency)
+        return text
+
+    def get_stats(self) -> dict:
+        return {name: model_tier.as_dict() for name, model_tier in self.tiers.items()}
 
 
 ai_service = AIService()
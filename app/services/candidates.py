@@ -0,0 +1,380 @@
+import abc
+import asyncio
+import json
+import logging
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Optional, Tuple
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+KNOWN_SKILLS = [
+    "python",
+    "fastapi",
+    "django",
+    "flask",
+    "aiohttp",
+    "aiogram",
+    "asyncio",
+    "celery",
+    "pydantic",
+    "sqlalchemy",
+    "postgresql",
+    "mysql",
+    "mongodb",
+    "redis",
+    "rabbitmq",
+    "kafka",
+    "docker",
+    "kubernetes",
+    "linux",
+    "git",
+    "java",
+    "kotlin",
+    "php",
+    "golang",
+    "c#",
+    "c++",
+    "1c",
+    "javascript",
+    "typescript",
+]
+
+_SKILL_PATTERNS = {
+    skill: re.compile(rf"(?<![\w#+]){re.escape(skill)}(?![\w#+])", re.IGNORECASE)
+    for skill in KNOWN_SKILLS
+}
+
+
+def extract_skills(text: str) -> List[str]:
+    """
+    Finds known technologies in the resume text. Returns them in lower case.
+    """
+    return [skill for skill, pattern in _SKILL_PATTERNS.items() if pattern.search(text)]
+
+
+class CandidateBackend(abc.ABC):
+    """
+    Storage engine for candidates. Methods are blocking, CandidateStore
+    calls them in its own thread.
+
+    Ids must grow together with created_at: insert_many gets records in
+    created_at order and must give them increasing ids, and query may turn
+    a date range into an id range. A backend that assigns ids otherwise,
+    or rows imported with an older created_at, break the date filter silently.
+    """
+
+    @abc.abstractmethod
+    def init(self): ...
+
+    @abc.abstractmethod
+    def insert_many(self, records: List[dict]): ...
+
+    @abc.abstractmethod
+    def query(
+        self,
+        skill: Optional[str] = None,
+        verdict: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        cursor: Optional[int] = None,
+        limit: int = 50,
+    ) -> Tuple[List[dict], Optional[int]]:
+        """
+        Returns a page of candidates (newest first) and the cursor of the next page.
+        """
+
+    @abc.abstractmethod
+    def close(self): ...
+
+
+class SQLiteBackend(CandidateBackend):
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS candidates (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        first_name TEXT,
+        last_name TEXT,
+        phone TEXT,
+        source TEXT NOT NULL,
+        verdict TEXT NOT NULL,
+        resume_text TEXT,
+        created_at TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS candidate_skills (
+        skill TEXT NOT NULL,
+        candidate_id INTEGER NOT NULL REFERENCES candidates(id),
+        PRIMARY KEY (skill, candidate_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_candidate_skills_candidate ON candidate_skills (candidate_id);
+    CREATE INDEX IF NOT EXISTS idx_candidates_verdict ON candidates (verdict, id);
+    CREATE INDEX IF NOT EXISTS idx_candidates_created_at ON candidates (created_at);
+    CREATE INDEX IF NOT EXISTS idx_candidates_user_id ON candidates (user_id);
+    """
+
+    _COLUMNS = (
+        "c.id, c.user_id, c.first_name, c.last_name, c.phone, c.source, c.verdict, c.created_at, "
+        "(SELECT group_concat(s.skill, ',') FROM candidate_skills s WHERE s.candidate_id = c.id) AS skills"
+    )
+
+    # An id bigger than any existing one is returned if there are no records after the date.
+    # Records of the same second are told apart by id (the created_at index includes it)
+    _FIRST_ID_SINCE = (
+        "SELECT coalesce((SELECT id FROM candidates WHERE created_at >= ? "
+        "ORDER BY created_at, id LIMIT 1), 9223372036854775807)"
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn: Optional[sqlite3.Connection] = None
+
+    def init(self):
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self._SCHEMA)
+
+    def insert_many(self, records: List[dict]):
+        with self.conn:
+            for record in records:
+                cursor = self.conn.execute(
+                    "INSERT INTO candidates "
+                    "(user_id, first_name, last_name, phone, source, verdict, resume_text, created_at) "
+                    "VALUES (:user_id, :first_name, :last_name, :phone, :source, :verdict, :resume_text, :created_at)",
+                    record,
+                )
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO candidate_skills (skill, candidate_id) VALUES (?, ?)",
+                    [(skill, cursor.lastrowid) for skill in record["skills"]],
+                )
+
+    def query(
+        self,
+        skill: Optional[str] = None,
+        verdict: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        cursor: Optional[int] = None,
+        limit: int = 50,
+    ) -> Tuple[List[dict], Optional[int]]:
+        # Keyset pagination: "id < cursor" stays fast on any page, unlike OFFSET.
+        # With a skill filter the skill index drives the scan, so we order by its column.
+        if skill:
+            key = "f.candidate_id"
+            sql = (
+                f"SELECT {self._COLUMNS} FROM candidate_skills f "
+                "JOIN candidates c ON c.id = f.candidate_id"
+            )
+            conditions, params = ["f.skill = ?"], [skill.lower()]
+        else:
+            key = "c.id"
+            sql = f"SELECT {self._COLUMNS} FROM candidates c"
+            conditions, params = [], []
+
+        if verdict:
+            conditions.append("c.verdict = ?")
+            params.append(verdict)
+
+        # Ids grow together with created_at (see CandidateBackend),
+        # so a date range can be turned into an id range using the created_at index
+        if date_from:
+            conditions.append(f"{key} >= ({self._FIRST_ID_SINCE})")
+            params.append(date_from.isoformat())
+        if date_to:
+            conditions.append(f"{key} < ({self._FIRST_ID_SINCE})")
+            params.append((date_to + timedelta(days=1)).isoformat())
+        if cursor:
+            conditions.append(f"{key} < ?")
+            params.append(cursor)
+
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {key} DESC LIMIT ?"
+        params.append(limit + 1)
+
+        rows = self.conn.execute(sql, params).fetchall()
+        items = [
+            {**dict(row), "skills": row["skills"].split(",") if row["skills"] else []}
+            for row in rows[:limit]
+        ]
+        next_cursor = items[-1]["id"] if len(rows) > limit else None
+        return items, next_cursor
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class CandidateStore:
+    """
+    Write-behind buffer in front of a backend.
+    Handlers only put a record into the queue, a background task
+    writes them in batches (by size or by time, whichever comes first).
+    A failed batch is retried with backoff, and if the backend is still failing,
+    appended as JSON lines to `failed_path` so the candidates can be recovered.
+    """
+
+    def __init__(
+        self,
+        backend: CandidateBackend,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_queue: int = 10_000,
+        write_retries: int = 3,
+        retry_delay: float = 0.5,
+        failed_path: Optional[str] = None,
+    ):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.write_retries = write_retries
+        self.retry_delay = retry_delay
+        self.failed_path = failed_path
+        self._last_created_at = ""
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        # One thread, so the backend connection is never used concurrently
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="candidates"
+        )
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+
+    async def start(self):
+        await self._run(self.backend.init)
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """
+        Writes everything that is left in the buffer and closes the backend.
+        """
+        if self._task is not None:
+            # None is a stop marker: the flusher writes what it has and exits
+            await self.queue.put(None)
+            await self._task
+            self._task = None
+
+        await self._run(self.backend.close)
+
+    async def save(
+        self,
+        user_id: int,
+        source: str,
+        verdict: str,
+        resume_text: str,
+        first_name: Optional[str] = None,
+        last_name: Optional[str] = None,
+        phone: Optional[str] = None,
+    ):
+        # The wall clock can step back (NTP), but ids must grow with created_at
+        created_at = max(
+            datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            self._last_created_at,
+        )
+        self._last_created_at = created_at
+        await self.queue.put(
+            {
+                "user_id": user_id,
+                "first_name": first_name,
+                "last_name": last_name,
+                "phone": phone,
+                "source": source,
+                "verdict": verdict,
+                "resume_text": resume_text,
+                "skills": extract_skills(resume_text),
+                "created_at": created_at,
+            }
+        )
+
+    async def _flush_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            record = await self.queue.get()
+            if record is None:
+                return
+
+            batch = [record]
+            deadline = loop.time() + self.flush_interval
+            stopping = False
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if record is None:
+                    stopping = True
+                    break
+                batch.append(record)
+
+            await self._write(batch)
+            if stopping:
+                return
+
+    async def _write(self, batch: List[dict]):
+        # Retried in place, so later batches don't overtake this one and keep the id order
+        for attempt in range(self.write_retries + 1):
+            try:
+                await self._run(self.backend.insert_many, batch)
+                logger.info(f"Saved {len(batch)} candidates")
+                return
+            except Exception as e:
+                logger.warning(
+                    f"Error saving candidates (attempt {attempt + 1}): {e}",
+                    exc_info=True,
+                )
+            if attempt < self.write_retries:
+                await asyncio.sleep(self.retry_delay * 2**attempt)
+
+        logger.error(f"Could not save {len(batch)} candidates, dumping them")
+        try:
+            await self._run(self._dump, batch)
+        except Exception as e:
+            logger.error(f"Error dumping candidates: {e}", exc_info=True)
+
+    def _dump(self, batch: List[dict]):
+        if not self.failed_path:
+            raise RuntimeError("failed_path is not set, the candidates are lost")
+        Path(self.failed_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(self.failed_path, "a", encoding="utf-8") as file:
+            for record in batch:
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    async def query(self, **filters) -> Tuple[List[dict], Optional[int]]:
+        return await self._run(self.backend.query, **filters)
+
+    async def select_user_ids(self, **filters) -> List[int]:
+        """
+        Distinct user ids of all candidates matching the filters (e.g. for a broadcast).
+        """
+        user_ids = {}
+        cursor = None
+        while True:
+            items, cursor = await self.query(cursor=cursor, limit=1000, **filters)
+            user_ids.update(dict.fromkeys(item["user_id"] for item in items))
+            if cursor is None:
+                return list(user_ids)
+
+
+candidate_store = CandidateStore(
+    SQLiteBackend(settings.CANDIDATES_DB_PATH),
+    batch_size=settings.CANDIDATES_BATCH_SIZE,
+    flush_interval=settings.CANDIDATES_FLUSH_INTERVAL,
+    write_retries=settings.CANDIDATES_WRITE_RETRIES,
+    failed_path=settings.CANDIDATES_FAILED_PATH,
+)
@@ -0,0 +1,272 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramRetryAfter,
+)
+from redis.asyncio import Redis
+
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Global send rate of the bot. After RetryAfter the whole bucket is paused,
+    because Telegram's flood limit applies to the bot, not to a single chat.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        # Small capacity: no bursts above the rate, Telegram counts them too
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ChatPacer:
+    """
+    Minimal interval between messages to the same chat
+    (Telegram allows ~1 msg/s to a user and ~20 msg/min to a group).
+    """
+
+    # Forget chats that have been idle for a while, so the dict doesn't grow forever
+    MAX_CHATS = 10_000
+
+    def __init__(self, interval: float, group_interval: float):
+        self.interval = interval
+        self.group_interval = group_interval
+        self.next_at: Dict[int, float] = {}
+
+    async def wait(self, chat_id: int):
+        now = time.monotonic()
+        if len(self.next_at) > self.MAX_CHATS:
+            self.next_at = {chat: at for chat, at in self.next_at.items() if at > now}
+
+        interval = self.group_interval if chat_id < 0 else self.interval
+        at = max(now, self.next_at.get(chat_id, 0.0))
+        self.next_at[chat_id] = at + interval
+        if at > now:
+            await asyncio.sleep(at - now)
+
+
+class Broadcaster:
+    """
+    Sends one text to many chats.
+    Everything is stored in Redis, so after a restart unfinished broadcasts continue:
+    - broadcast:{id}             hash with the text and counters
+    - broadcast:{id}:pending     chats that haven't received the message yet
+    - broadcast:{id}:processing  chats being sent right now (back to pending after a crash)
+    - broadcasts:active          ids of running broadcasts
+    """
+
+    ACTIVE_KEY = "broadcasts:active"
+    MAX_ATTEMPTS = 3
+    # How long the stats of a finished broadcast are kept
+    RESULT_TTL = 7 * 24 * 3600
+
+    def __init__(
+        self,
+        redis: Redis,
+        bot: Bot,
+        rate: float,
+        chat_interval: float,
+        group_interval: float,
+        concurrency: int,
+    ):
+        self.redis = redis
+        self.bot = bot
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate)
+        self.pacer = ChatPacer(chat_interval, group_interval)
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def _key(broadcast_id: str, suffix: str = "") -> str:
+        return f"broadcast:{broadcast_id}{suffix}"
+
+    async def start(self):
+        for broadcast_id in await self.redis.smembers(self.ACTIVE_KEY):
+            # At-least-once: chats that were being sent during the crash get the message again
+            while await self.redis.lmove(
+                self._key(broadcast_id, ":processing"),
+                self._key(broadcast_id, ":pending"),
+                "RIGHT",
+                "LEFT",
+            ):
+                pass
+            logger.info(f"Resuming broadcast {broadcast_id}")
+            self._spawn(broadcast_id)
+
+    async def stop(self):
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+    def _spawn(self, broadcast_id: str):
+        task = asyncio.create_task(self._run(broadcast_id))
+        self._tasks[broadcast_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(broadcast_id, None))
+
+    async def create(self, text: str, chat_ids: Iterable[int]) -> str:
+        chat_ids = list(dict.fromkeys(chat_ids))
+        broadcast_id = uuid.uuid4().hex
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                self._key(broadcast_id),
+                mapping={
+                    "text": text,
+                    "status": "running",
+                    "total": len(chat_ids),
+                    "sent": 0,
+                    "failed": 0,
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "started_at": time.time(),
+                },
+            )
+            for offset in range(0, len(chat_ids), 1000):
+                pipe.rpush(
+                    self._key(broadcast_id, ":pending"),
+                    *chat_ids[offset : offset + 1000],
+                )
+            pipe.sadd(self.ACTIVE_KEY, broadcast_id)
+            await pipe.execute()
+
+        logger.info(f"Broadcast {broadcast_id} created for {len(chat_ids)} chats")
+        self._spawn(broadcast_id)
+        return broadcast_id
+
+    async def cancel(self, broadcast_id: str) -> bool:
+        """
+        Returns False if the broadcast isn't running (finished, cancelled or unknown),
+        so the status and the TTL of a finished one are left as they are.
+        """
+        if await self.redis.hget(self._key(broadcast_id), "status") != "running":
+            return False
+
+        task = self._tasks.get(broadcast_id)
+        if task is not None:
+            task.cancel()
+            await asyncio.wait({task})
+
+        # _run may have finished the broadcast while we were reading the status
+        # or cancelling. It is stopped now and this process owns the broadcast,
+        # so nothing can change the status between this check and _finish
+        if await self.redis.hget(self._key(broadcast_id), "status") != "running":
+            return False
+        await self._finish(broadcast_id, "cancelled")
+        return True
+
+    async def get_progress(self, broadcast_id: str) -> Optional[dict]:
+        data = await self.redis.hgetall(self._key(broadcast_id))
+        if not data:
+            return None
+
+        pending = await self.redis.llen(
+            self._key(broadcast_id, ":pending")
+        ) + await self.redis.llen(self._key(broadcast_id, ":processing"))
+        sent, failed = int(data["sent"]), int(data["failed"])
+        finished_at = float(data.get("finished_at") or time.time())
+        elapsed = max(finished_at - float(data["started_at"]), 1e-6)
+        throughput = (sent + failed) / elapsed
+
+        return {
+            "id": broadcast_id,
+            "status": data["status"],
+            "total": int(data["total"]),
+            "sent": sent,
+            "failed": failed,
+            "pending": pending,
+            "throughput": round(throughput, 2),
+            "eta_seconds": round(pending / throughput) if throughput else None,
+            "created_at": data["created_at"],
+        }
+
+    async def _finish(self, broadcast_id: str, status: str):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                self._key(broadcast_id),
+                mapping={"status": status, "finished_at": time.time()},
+            )
+            pipe.delete(
+                self._key(broadcast_id, ":pending"),
+                self._key(broadcast_id, ":processing"),
+                self._key(broadcast_id, ":attempts"),
+            )
+            pipe.srem(self.ACTIVE_KEY, broadcast_id)
+            pipe.expire(self._key(broadcast_id), self.RESULT_TTL)
+            await pipe.execute()
+        logger.info(f"Broadcast {broadcast_id} {status}")
+
+    async def _run(self, broadcast_id: str):
+        text = await self.redis.hget(self._key(broadcast_id), "text")
+        workers = [self._worker(broadcast_id, text) for _ in range(self.concurrency)]
+        await asyncio.gather(*workers)
+        await self._finish(broadcast_id, "done")
+
+    async def _worker(self, broadcast_id: str, text: str):
+        pending = self._key(broadcast_id, ":pending")
+        processing = self._key(broadcast_id, ":processing")
+
+        while True:
+            chat_id = await self.redis.lmove(pending, processing, "LEFT", "RIGHT")
+            if chat_id is None:
+                return
+            await self._deliver(broadcast_id, int(chat_id), text)
+            await self.redis.lrem(processing, 1, chat_id)
+
+    async def _deliver(self, broadcast_id: str, chat_id: int, text: str):
+        await self.pacer.wait(chat_id)
+        await self.bucket.acquire()
+
+        try:
+            await self.bot.send_message(chat_id, text)
+            await self.redis.hincrby(self._key(broadcast_id), "sent", 1)
+        except TelegramRetryAfter as e:
+            logger.warning(f"Flood limit, pausing broadcasts for {e.retry_after}s")
+            self.bucket.pause(e.retry_after)
+            await self.redis.rpush(self._key(broadcast_id, ":pending"), chat_id)
+        except (TelegramForbiddenError, TelegramBadRequest) as e:
+            # The user blocked the bot or the chat doesn't exist: retrying won't help
+            logger.info(f"Can't send broadcast to {chat_id}: {e}")
+            await self.redis.hincrby(self._key(broadcast_id), "failed", 1)
+        except Exception as e:
+            attempts = await self.redis.hincrby(
+                self._key(broadcast_id, ":attempts"), chat_id, 1
+            )
+            logger.warning(f"Error sending broadcast to {chat_id} ({attempts}): {e}")
+            if attempts < self.MAX_ATTEMPTS:
+                await self.redis.rpush(self._key(broadcast_id, ":pending"), chat_id)
+            else:
+                await self.redis.hincrby(self._key(broadcast_id), "failed", 1)
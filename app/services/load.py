@@ -0,0 +1,128 @@
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Iterable, Optional
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class LoadMonitor:
+    """
+    Watches event loop lag and the number of handlers in progress.
+    The bot uses it to shed low-priority updates and to drain handlers on shutdown.
+    """
+
+    def __init__(
+        self,
+        max_loop_lag: float,
+        max_in_flight: int,
+        sample_interval: float = 0.25,
+        window: int = 8,
+    ):
+        self.max_loop_lag = max_loop_lag
+        self.max_in_flight = max_in_flight
+        self.sample_interval = sample_interval
+        self.lags = deque(maxlen=window)
+        self.in_flight = 0
+        self.shed = 0
+        self.draining = False
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def loop_lag(self) -> float:
+        """
+        The worst lag over the last few samples, so that a single spike is not missed.
+        """
+        return max(self.lags, default=0.0)
+
+    @property
+    def overloaded(self) -> bool:
+        return self.loop_lag > self.max_loop_lag or self.in_flight >= self.max_in_flight
+
+    @property
+    def ready(self) -> bool:
+        return not self.draining and not self.overloaded
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._sample_lag())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _sample_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.sample_interval)
+            lag = max(0.0, loop.time() - started - self.sample_interval)
+            self.lags.append(lag)
+            if lag > self.max_loop_lag:
+                logger.warning(f"Event loop lag is {lag:.3f}s")
+
+    @asynccontextmanager
+    async def track(self):
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self._idle.set()
+
+    async def drain(self, timeout: float, tasks: Iterable[asyncio.Task] = ()) -> bool:
+        """
+        Waits until all handlers in progress are finished.
+        tasks: update tasks of the dispatcher; they may still be in outer middlewares
+        (e.g. loading the FSM state), where the handler counter doesn't see them yet.
+        Returns False if some of them are still running after `timeout`.
+        """
+        self.draining = True
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        tasks = set(tasks)
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            if pending:
+                logger.warning(f"{len(pending)} updates are still running after drain")
+                return False
+
+        if self._idle.is_set():
+            return True
+        try:
+            await asyncio.wait_for(
+                self._idle.wait(), timeout=max(deadline - loop.time(), 0)
+            )
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"{self.in_flight} handlers are still running after drain")
+            return False
+
+    def as_dict(self) -> dict:
+        return {
+            "ready": self.ready,
+            "draining": self.draining,
+            "loop_lag": round(self.loop_lag, 4),
+            "in_flight": self.in_flight,
+            "shed": self.shed,
+        }
+
+
+load_monitor = LoadMonitor(
+    max_loop_lag=settings.LOAD_MAX_LOOP_LAG,
+    max_in_flight=settings.LOAD_MAX_IN_FLIGHT,
+)
@@ -1,15 +1,154 @@
 import io
+import re
+import codecs
 import logging
 import asyncio
-from typing import Optional
+import zipfile
+from html.parser import HTMLParser
+from typing import Iterator, Optional
+from xml.etree import ElementTree
 import httpx
 from pypdf import PdfReader
 from bs4 import BeautifulSoup
+from app.config import settings
+from app.services.recording import recorder
 
 
 logger = logging.getLogger(__name__)
 
 
+FORMATS_BY_MIME = {
+    "application/pdf": "pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+    "application/rtf": "rtf",
+    "application/x-rtf": "rtf",
+    "text/rtf": "rtf",
+    "text/plain": "txt",
+    "text/html": "html",
+    "application/xhtml+xml": "html",
+}
+
+FORMATS_BY_EXTENSION = {
+    "pdf": "pdf",
+    "docx": "docx",
+    "rtf": "rtf",
+    "txt": "txt",
+    "html": "html",
+    "htm": "html",
+}
+
+# Types that clients send for files of any format: only the content can tell
+GENERIC_MIME_TYPES = {
+    "application/octet-stream",
+    "binary/octet-stream",
+    "application/msword",
+    "application/zip",
+    "application/x-zip-compressed",
+}
+
+_DOCX_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_HTML_START = re.compile(rb"\s*(<!doctype\s+html|<html)", re.IGNORECASE)
+
+_RTF_TOKEN = re.compile(
+    r"\\([a-z]{1,32})(-?\d{1,10})?[ ]?|\\'([0-9a-f]{2})|\\([^a-z])|([{}])|[\r\n]+|(.)",
+    re.IGNORECASE | re.DOTALL,
+)
+# Groups with metadata, not with the document text
+_RTF_DESTINATIONS = {
+    "fonttbl",
+    "colortbl",
+    "stylesheet",
+    "info",
+    "pict",
+    "object",
+    "header",
+    "headerl",
+    "headerr",
+    "footer",
+    "footerl",
+    "footerr",
+    "listtable",
+    "listoverridetable",
+    "rsidtbl",
+    "xmlnstbl",
+    "themedata",
+    "colorschememapping",
+    "latentstyles",
+    "datastore",
+    "generator",
+    "fldinst",
+}
+_RTF_SPECIAL_CHARS = {
+    "par": "\n",
+    "line": "\n",
+    "row": "\n",
+    "sect": "\n",
+    "page": "\n",
+    "tab": "\t",
+    "cell": " ",
+    "emdash": "\u2014",
+    "endash": "\u2013",
+    "bullet": "\u2022",
+    "lquote": "\u2018",
+    "rquote": "\u2019",
+    "ldblquote": "\u201c",
+    "rdblquote": "\u201d",
+}
+
+
+def _clean_lines(text: str) -> Optional[str]:
+    cleaned_lines = [line.strip() for line in text.splitlines() if line.strip()]
+    return "\n".join(cleaned_lines) or None
+
+
+class _HTMLTextExtractor(HTMLParser):
+    """
+    Streaming HTML -> text. Unlike BeautifulSoup, it doesn't build a tree,
+    so we can feed it chunks and stop as soon as we have enough text.
+    """
+
+    _SKIP_TAGS = {"script", "style", "noscript", "template", "head", "svg"}
+    _BLOCK_TAGS = {
+        "p",
+        "div",
+        "br",
+        "li",
+        "tr",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "section",
+        "article",
+        "table",
+    }
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.length = 0
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self._BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in self._BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+            self.length += len(data)
+
+
 class ContentParser:
     _DEFAULT_HEADERS = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -26,16 +165,111 @@ class ContentParser:
         "Sec-Fetch-User": "?1",
     }
 
+    # Bytes decoded per step by the text parsers
+    CHUNK_SIZE = 64 * 1024
+    # The markup of a real resume is a few MB, more is a zip bomb
+    DOCX_XML_MAX_BYTES = 32 * 1024 * 1024
+
     @staticmethod
-    def parse_pdf(file_bytes: bytes) -> Optional[str]:
+    def guess_format(
+        mime_type: Optional[str], file_name: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Format by the MIME type or the file extension, before the file is downloaded.
+        """
+        if mime_type in FORMATS_BY_MIME:
+            return FORMATS_BY_MIME[mime_type]
+        if file_name and "." in file_name:
+            return FORMATS_BY_EXTENSION.get(file_name.rsplit(".", 1)[1].lower())
+        return None
+
+    @staticmethod
+    def may_be_supported(mime_type: Optional[str]) -> bool:
+        """
+        Whether the file is worth downloading. Only a known MIME type of another
+        format (image/jpeg, video/mp4...) is rejected up front, the rest is up to detect_format.
+        """
+        return (
+            not mime_type
+            or mime_type in FORMATS_BY_MIME
+            or mime_type in GENERIC_MIME_TYPES
+        )
+
+    @classmethod
+    def detect_format(
+        cls,
+        file_bytes: bytes,
+        mime_type: Optional[str] = None,
+        file_name: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Magic bytes win over the MIME type: Telegram clients often send
+        application/octet-stream or a wrong type.
+        """
+        head = file_bytes[:1024]
+        for bom in (codecs.BOM_UTF8, codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE):
+            if head.startswith(bom):
+                head = head[len(bom) :]
+                break
+
+        if b"%PDF-" in head:
+            return "pdf"
+        if head.startswith(b"PK\x03\x04"):
+            # Any zip is "PK", only Word documents have word/document.xml
+            try:
+                with zipfile.ZipFile(io.BytesIO(file_bytes)) as archive:
+                    archive.getinfo("word/document.xml")
+                return "docx"
+            except (zipfile.BadZipFile, KeyError):
+                return None
+        if head.startswith(b"{\\rtf"):
+            return "rtf"
+        if _HTML_START.match(head):
+            return "html"
+
+        # Plain text has no signature, so here we have to trust the MIME type
+        guessed = cls.guess_format(mime_type, file_name)
+        return guessed if guessed in ("txt", "html") else None
+
+    @classmethod
+    def _iter_text(cls, file_bytes: bytes) -> Iterator[str]:
+        """
+        Decodes the file chunk by chunk. UTF-8 and UTF-16 (with BOM) are detected,
+        everything else is treated as cp1251, which is what Russian Windows produces.
+        """
+        encoding = "utf-8"
+        if file_bytes.startswith(codecs.BOM_UTF8):
+            encoding = "utf-8-sig"
+        elif file_bytes.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            encoding = "utf-16"
+        else:
+            try:
+                codecs.getincrementaldecoder("utf-8")().decode(
+                    file_bytes[: cls.CHUNK_SIZE]
+                )
+            except UnicodeDecodeError:
+                encoding = "cp1251"
+
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        for offset in range(0, len(file_bytes), cls.CHUNK_SIZE):
+            yield decoder.decode(file_bytes[offset : offset + cls.CHUNK_SIZE])
+        yield decoder.decode(b"", final=True)
+
+    @staticmethod
+    def parse_pdf(file_bytes: bytes, max_chars: Optional[int] = None) -> Optional[str]:
         try:
             reader = PdfReader(io.BytesIO(file_bytes))
             text_parts = []
+            length = 0
 
+            # Pages are parsed lazily, so we stop as soon as the budget is filled
             for page in reader.pages:
                 page_text = page.extract_text()
                 if page_text:
                     text_parts.append(page_text)
+                    length += len(page_text)
+                if max_chars and length >= max_chars:
+                    break
 
             full_text = "\n".join(text_parts).strip()
             return full_text if full_text else None
@@ -45,20 +279,206 @@ class ContentParser:
             return None
 
     @classmethod
-    async def extract_text_from_pdf(cls, file_bytes: bytes) -> Optional[str]:
+    def parse_docx(cls, file_bytes: bytes, max_chars: int) -> Optional[str]:
+        """
+        Streams word/document.xml from the archive without unpacking the rest
+        (images, fonts), reads at most DOCX_XML_MAX_BYTES of it and stops after `max_chars`.
+        Elements are dropped as soon as they are closed, so a huge paragraph
+        doesn't keep its runs in memory.
+        """
+        parts = []
+        length = 0
+        parents = []
+        read = 0
+        parser = ElementTree.XMLPullParser(events=("start", "end"))
+
+        with zipfile.ZipFile(io.BytesIO(file_bytes)) as archive:
+            with archive.open("word/document.xml") as stream:
+                while length < max_chars and read < cls.DOCX_XML_MAX_BYTES:
+                    chunk = stream.read(cls.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    read += len(chunk)
+                    parser.feed(chunk)
+
+                    for event, elem in parser.read_events():
+                        if event == "start":
+                            parents.append(elem)
+                            continue
+
+                        parents.pop()
+                        if elem.tag == f"{_DOCX_NS}t":
+                            text = elem.text or ""
+                        elif elem.tag == f"{_DOCX_NS}tab":
+                            text = "\t"
+                        elif elem.tag in (f"{_DOCX_NS}br", f"{_DOCX_NS}cr"):
+                            text = "\n"
+                        elif elem.tag == f"{_DOCX_NS}p":
+                            text = "\n"
+                        else:
+                            text = ""
+                        if parents:
+                            parents[-1].remove(elem)
+
+                        parts.append(text)
+                        length += len(text)
+                        if length >= max_chars:
+                            break
+
+        return _clean_lines("".join(parts))
+
+    @staticmethod
+    def parse_rtf(file_bytes: bytes, max_chars: int) -> Optional[str]:
+        """
+        A small RTF tokenizer: skips control words and metadata groups,
+        decodes \\'hh (by \\ansicpg) and \\uN characters.
+        """
+        # RTF itself is 7-bit, latin-1 just maps bytes to chars one to one
+        text = file_bytes.decode("latin-1")
+        codepage = "cp1252"
+        stack = []
+        ignorable = False
+        uc_skip = 1
+        skip = 0
+        out = []
+        length = 0
+
+        for match in _RTF_TOKEN.finditer(text):
+            word, arg, hex_code, char, brace, text_char = match.groups()
+
+            if brace:
+                skip = 0
+                if brace == "{":
+                    stack.append((uc_skip, ignorable))
+                elif stack:
+                    uc_skip, ignorable = stack.pop()
+                continue
+
+            if char:
+                skip = 0
+                if char == "*":
+                    ignorable = True
+                elif not ignorable and char in "{}\\":
+                    out.append(char)
+                elif not ignorable and char == "~":
+                    out.append("\xa0")
+            elif word:
+                skip = 0
+                if word == "ansicpg" and arg:
+                    codepage = f"cp{arg}"
+                elif word in _RTF_DESTINATIONS:
+                    ignorable = True
+                elif ignorable:
+                    continue
+                elif word in _RTF_SPECIAL_CHARS:
+                    out.append(_RTF_SPECIAL_CHARS[word])
+                elif word == "uc" and arg:
+                    uc_skip = int(arg)
+                elif word == "u" and arg:
+                    code = int(arg)
+                    out.append(chr(code + 0x10000 if code < 0 else code))
+                    skip = uc_skip
+            elif hex_code:
+                if skip:
+                    skip -= 1
+                elif not ignorable:
+                    try:
+                        out.append(bytes([int(hex_code, 16)]).decode(codepage))
+                    except (LookupError, UnicodeDecodeError):
+                        out.append("?")
+            elif text_char:
+                if skip:
+                    skip -= 1
+                elif not ignorable:
+                    out.append(text_char)
+            else:
+                continue
+
+            length = len(out)
+            if length >= max_chars:
+                break
+
+        return _clean_lines("".join(out))
+
+    @classmethod
+    def parse_txt(cls, file_bytes: bytes, max_chars: int) -> Optional[str]:
+        parts = []
+        length = 0
+        for chunk in cls._iter_text(file_bytes):
+            parts.append(chunk)
+            length += len(chunk)
+            if length >= max_chars:
+                break
+        return _clean_lines("".join(parts))
+
+    @classmethod
+    def parse_html(cls, file_bytes: bytes, max_chars: int) -> Optional[str]:
+        extractor = _HTMLTextExtractor()
+        for chunk in cls._iter_text(file_bytes):
+            extractor.feed(chunk)
+            if extractor.length >= max_chars:
+                break
+        extractor.close()
+        return _clean_lines("".join(extractor.parts))
+
+    @classmethod
+    def parse_document(
+        cls,
+        file_bytes: bytes,
+        mime_type: Optional[str] = None,
+        file_name: Optional[str] = None,
+        max_chars: Optional[int] = None,
+    ) -> Optional[str]:
+        max_chars = max_chars or settings.RESUME_CONTEXT_LIMIT
+        file_format = cls.detect_format(file_bytes, mime_type, file_name)
+        if file_format is None:
+            logger.warning(f"Unsupported document: {mime_type}, {file_name}")
+            return None
+
+        try:
+            text = getattr(cls, f"parse_{file_format}")(file_bytes, max_chars)
+        except Exception as e:
+            logger.error(f"Error parsing {file_format.upper()}: {e}", exc_info=True)
+            return None
+
+        return text[:max_chars] if text else None
+
+    @classmethod
+    async def extract_text_from_document(
+        cls,
+        file_bytes: bytes,
+        mime_type: Optional[str] = None,
+        file_name: Optional[str] = None,
+    ) -> Optional[str]:
         """
-        Async wrapper for PDF parsing.
-        Runs a CPU-bound task in a separate thread to avoid blocking the bot.
+        Detects the format and extracts text up to RESUME_CONTEXT_LIMIT characters.
+        Parsing is CPU-bound, so it runs in a separate thread to avoid blocking the bot.
         """
-        logger.info("Start parsing PDF")
+        logger.info(f"Start parsing document {mime_type}")
         loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, cls.parse_pdf, file_bytes)
+        text = await loop.run_in_executor(
+            None, cls.parse_document, file_bytes, mime_type, file_name
+        )
+
+        if recorder.enabled:
+            recorder.record_document(
+                cls.detect_format(file_bytes, mime_type, file_name),
+                len(file_bytes),
+                text or "",
+            )
+        return text
 
     @classmethod
     async def extract_text_from_url(cls, url: str) -> Optional[str]:
         """
         Parsing data from URL. Return a clear text or None
         """
+        text = await cls._download_text(url)
+        recorder.record_url(text)
+        return text
+
+    @classmethod
+    async def _download_text(cls, url: str) -> Optional[str]:
         logger.info(f"Trying to download data from URL: {url}")
 
         async with httpx.AsyncClient(
@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfiler:
+    """
+    Periodically records stacks of all threads (pypdf and BeautifulSoup run in executor threads)
+    and of all asyncio tasks (to see what the handlers are awaiting, e.g. Gemini).
+    The result is in the "folded stacks" format understood by flamegraph.pl and speedscope.
+    Nothing runs while the profiler is stopped.
+    """
+
+    def __init__(self):
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.duration = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._labels = {}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float, interval: float = 0.005):
+        if self.running:
+            raise RuntimeError("Profiler is already running")
+
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = time.monotonic()
+        self._loop = asyncio.get_running_loop()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(time.monotonic() + seconds, interval),
+            name="sampling-profiler",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info(f"Sampling profiler started for {seconds}s")
+
+    def stop(self) -> str:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            logger.info(f"Sampling profiler stopped, {self.samples} samples")
+        return self.folded()
+
+    def _run(self, deadline: float, interval: float):
+        own_id = threading.get_ident()
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            self._sample(own_id)
+            self.samples += 1
+            self._stop.wait(interval)
+        self.duration = time.monotonic() - self.started_at
+
+    def _sample(self, own_id: int):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)))
+            self.stacks[";".join(reversed(stack))] += 1
+
+        for stack in self._task_stacks():
+            self.stacks[";".join(["asyncio", *stack])] += 1
+
+    def _task_stacks(self) -> List[List[str]]:
+        try:
+            tasks = list(asyncio.all_tasks(self._loop))
+        except RuntimeError:
+            # The set of tasks changed during iteration, skip this sample
+            return []
+
+        result = []
+        for task in tasks:
+            stack = []
+            coro = task.get_coro()
+            while coro is not None:
+                code = getattr(coro, "cr_code", None) or getattr(coro, "gi_code", None)
+                if code is None:
+                    break
+                stack.append(self._label(code))
+                coro = getattr(coro, "cr_await", None) or getattr(
+                    coro, "gi_yieldfrom", None
+                )
+            if stack:
+                result.append(stack)
+        return result
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            for prefix in ("site-packages" + os.sep, os.getcwd() + os.sep):
+                if prefix in filename:
+                    filename = filename.split(prefix, 1)[1]
+                    break
+            label = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.items())
+
+
+class MemoryProfiler:
+    """
+    tracemalloc snapshots. Tracing is only enabled between the first snapshot and stop(),
+    because it slows down every allocation.
+    """
+
+    def __init__(self):
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+
+    @staticmethod
+    def _filter(snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+        return snapshot.filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            ]
+        )
+
+    @staticmethod
+    def _format(stat) -> dict:
+        frame = stat.traceback[0]
+        result = {
+            "file": frame.filename,
+            "line": frame.lineno,
+            "size": stat.size,
+            "count": stat.count,
+        }
+        if isinstance(stat, tracemalloc.StatisticDiff):
+            result["size_diff"] = stat.size_diff
+            result["count_diff"] = stat.count_diff
+        return result
+
+    def snapshot(self, frames: int = 1, limit: int = 20) -> dict:
+        """
+        Starts tracing if needed and saves a new baseline for diff().
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            logger.info("tracemalloc started")
+
+        self.baseline = self._filter(tracemalloc.take_snapshot())
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "traced_memory": current,
+            "peak": peak,
+            "top": [
+                self._format(stat)
+                for stat in self.baseline.statistics("lineno")[:limit]
+            ],
+        }
+
+    def diff(self, path: Optional[str] = None, limit: int = 20) -> dict:
+        """
+        Compares the current memory with the baseline. `path` keeps only files containing it.
+        """
+        if self.baseline is None or not tracemalloc.is_tracing():
+            raise RuntimeError("Take a snapshot first")
+
+        snapshot = self._filter(tracemalloc.take_snapshot())
+        if path:
+            snapshot = snapshot.filter_traces([tracemalloc.Filter(True, f"*{path}*")])
+            baseline = self.baseline.filter_traces(
+                [tracemalloc.Filter(True, f"*{path}*")]
+            )
+        else:
+            baseline = self.baseline
+
+        stats = snapshot.compare_to(baseline, "lineno")
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "traced_memory": current,
+            "peak": peak,
+            "top": [self._format(stat) for stat in stats[:limit]],
+        }
+
+    def stop(self):
+        self.baseline = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("tracemalloc stopped")
+
+
+sampling_profiler = SamplingProfiler()
+memory_profiler = MemoryProfiler()
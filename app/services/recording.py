@@ -0,0 +1,162 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Iterable, Iterator, Optional, Set, Union
+from app.services.candidates import KNOWN_SKILLS
+
+
+logger = logging.getLogger(__name__)
+
+
+_URL = re.compile(r"(https?)://([^/\s]+)[^\s]*")
+_WORD = re.compile(r"[^\W\d_]+")
+_DIGIT = re.compile(r"\d")
+
+# Fields of a Telegram update that identify a person
+_ID_FIELDS = {"id", "user_id", "chat_id"}
+# With the bot token, a file id is enough to download the original file
+_FILE_ID_FIELDS = {"file_id", "file_unique_id"}
+_NAME_FIELDS = {"last_name", "username", "title", "vcard"}
+
+
+class Recorder:
+    """
+    Writes a compact (gzip, JSON lines) log of what the bot receives:
+    updates, parser inputs and Gemini answers. It's used to replay real traffic
+    in performance tests (see benchmarks/replay.py).
+
+    Everything is redacted before it hits the disk: user and file ids are replaced
+    with salted hashes, names and phones are replaced, links keep only the host, and in free text every word except known skills
+    is replaced with "x" of the same length, so sizes and routing stay realistic.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.keep_texts: Set[str] = set()
+        self._file = None
+        self._started_at = 0.0
+        self._salt = b""
+
+    def start(
+        self, path: str, keep_texts: Iterable[str] = (), salt: Optional[bytes] = None
+    ):
+        """
+        keep_texts: exact messages to keep as is, e.g. keyboard buttons that handlers match on
+        salt: fixed salt of the pseudonyms (for generated sessions), random by default
+        """
+        self.keep_texts = set(keep_texts)
+        self._salt = salt or os.urandom(16)
+        self._file = gzip.open(path, "at", encoding="utf-8")
+        self._started_at = time.monotonic()
+        self.enabled = True
+        logger.info(f"Recording traffic to {path}")
+
+    def stop(self):
+        self.enabled = False
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, event_type: str, **data):
+        event = {"t": round(time.monotonic() - self._started_at, 4), "type": event_type}
+        event.update(data)
+        self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+    def record_update(self, update: dict):
+        if self.enabled:
+            self._write("update", data=self.redact_update(update))
+
+    def record_document(self, file_format: Optional[str], size: int, text: str):
+        if self.enabled:
+            self._write(
+                "document", format=file_format, size=size, text=self.scramble(text)
+            )
+
+    def record_url(self, text: Optional[str]):
+        if self.enabled:
+            self._write("url", text=self.scramble(text) if text else None)
+
+    def record_ai(self, tier: str, text: str, latency: float):
+        if self.enabled:
+            self._write(
+                "ai", tier=tier, text=self.scramble(text), latency=round(latency, 4)
+            )
+
+    def pseudonymize(self, value: Union[int, str]) -> Union[int, str]:
+        digest = hashlib.sha256(self._salt + str(value).encode()).digest()
+        if isinstance(value, str):
+            return digest[:12].hex()
+        pseudo_id = int.from_bytes(digest[:4], "big") + 1
+        return -pseudo_id if value < 0 else pseudo_id
+
+    @staticmethod
+    def scramble(text: str) -> str:
+        """
+        Replaces every word except known skills with "x" and every digit with "0".
+        URLs keep only the scheme and the host.
+        """
+        parts = []
+        position = 0
+        for match in _URL.finditer(text):
+            parts.append(Recorder._scramble_words(text[position : match.start()]))
+            parts.append(f"{match.group(1)}://{match.group(2)}/redacted")
+            position = match.end()
+        parts.append(Recorder._scramble_words(text[position:]))
+        return "".join(parts)
+
+    @staticmethod
+    def _scramble_words(text: str) -> str:
+        text = _WORD.sub(
+            lambda m: (
+                m.group() if m.group().lower() in KNOWN_SKILLS else "x" * len(m.group())
+            ),
+            text,
+        )
+        return _DIGIT.sub("0", text)
+
+    def redact_update(self, value: Any, key: str = "") -> Any:
+        if isinstance(value, dict):
+            return {
+                k: self.redact_update(v, k)
+                for k, v in value.items()
+                if k not in _NAME_FIELDS
+            }
+        if isinstance(value, list):
+            return [self.redact_update(item, key) for item in value]
+        if key in _ID_FIELDS and isinstance(value, int):
+            return self.pseudonymize(value)
+        if key in _FILE_ID_FIELDS and isinstance(value, str):
+            return self.pseudonymize(value)
+        if key == "url" and isinstance(value, str):
+            # text_link entities and link previews: profile links with personal ids
+            return self.scramble(value)
+        if key == "first_name":
+            # Required by Telegram types, so it's replaced, not removed
+            return "User"
+        if key == "phone_number":
+            return "+10000000000"
+        if key == "file_name":
+            return "resume" + os.path.splitext(value)[1]
+        if key in ("text", "caption") and isinstance(value, str):
+            if value in self.keep_texts:
+                return value
+            if value.startswith("/"):
+                # Commands are kept, their arguments are not
+                command, _, args = value.partition(" ")
+                return f"{command} {self.scramble(args)}".rstrip()
+            return self.scramble(value)
+        return value
+
+
+def read_recording(path: str) -> Iterator[dict]:
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+recorder = Recorder()
@@ -0,0 +1,86 @@
+"""
+Per-format benchmark of the resume parsers.
+
+    make bench
+
+For every format it parses a short resume and a long document (~200 pages)
+with the production budget (RESUME_CONTEXT_LIMIT) and without it,
+and prints the median time and the peak memory of a parse.
+"""
+
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:benchmark")
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+from app.config import settings  # noqa: E402
+from app.services.parser import ContentParser  # noqa: E402
+from benchmarks.documents import (  # noqa: E402
+    make_docx,
+    make_html,
+    make_pdf,
+    make_rtf,
+    make_txt,
+)
+
+
+LINE = "Senior Python Developer: FastAPI, Redis, PostgreSQL, Docker, asyncio."
+NO_BUDGET = sys.maxsize
+
+
+SAMPLES = {
+    "pdf": (make_pdf([LINE] * 80), make_pdf([LINE] * 8000)),
+    # Images are not read by the parser, but make the archive realistic
+    "docx": (
+        make_docx([LINE] * 80, media_size=256 * 1024),
+        make_docx([LINE] * 8000, media_size=256 * 1024),
+    ),
+    "rtf": (make_rtf([LINE] * 80), make_rtf([LINE] * 8000)),
+    "txt": (make_txt([LINE] * 80), make_txt([LINE] * 8000)),
+    "html": (make_html([LINE] * 80), make_html([LINE] * 8000)),
+}
+
+
+def measure(file_format: str, file_bytes: bytes, max_chars: int, repeat: int):
+    parser = getattr(ContentParser, f"parse_{file_format}")
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        text = parser(file_bytes, max_chars)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    parser(file_bytes, max_chars)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return statistics.median(timings), peak, len(text or "")
+
+
+def main():
+    repeat = int(os.environ.get("BENCH_REPEAT", 5))
+    budget = settings.RESUME_CONTEXT_LIMIT
+
+    print(
+        f"{'format':<6} {'size':>6} {'file KB':>8} {'budget':>8} "
+        f"{'median ms':>10} {'peak KB':>9} {'chars':>8}"
+    )
+    for file_format, (small, large) in SAMPLES.items():
+        for size, file_bytes in (("small", small), ("large", large)):
+            for label, max_chars in ((str(budget), budget), ("none", NO_BUDGET)):
+                seconds, peak, chars = measure(
+                    file_format, file_bytes, max_chars, repeat
+                )
+                print(
+                    f"{file_format:<6} {size:>6} {len(file_bytes) / 1024:>8.0f} {label:>8} "
+                    f"{seconds * 1000:>10.2f} {peak / 1024:>9.0f} {chars:>8}"
+                )
+
+
+if __name__ == "__main__":
+    main()
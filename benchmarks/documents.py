@@ -0,0 +1,126 @@
+"""
+Builders of resume files in every supported format, shared by the parser benchmark,
+the replay harness and the parser tests. Only the structure the parsers read is generated.
+"""
+
+import html
+import io
+import os
+import zipfile
+from typing import List, Optional
+from xml.sax.saxutils import escape
+
+
+def make_pdf(lines: List[str], lines_per_page: int = 40) -> bytes:
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # the page tree is filled in when the page ids are known
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for offset in range(0, len(lines), lines_per_page):
+        text = " ".join(
+            "({}) Tj T*".format(
+                line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            )
+            for line in lines[offset : offset + lines_per_page]
+        )
+        stream = f"BT /F1 10 Tf 14 TL 40 800 Td {text} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1", "replace"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF".encode()
+    )
+    return out.getvalue()
+
+
+def make_docx(paragraphs: List[str], raw: bool = False, media_size: int = 0) -> bytes:
+    """
+    raw: paragraphs are already the markup inside <w:p> (runs, tabs, breaks)
+    media_size: adds an image the parser doesn't read, like in a real resume
+    """
+    body = "".join(
+        (
+            f"<w:p>{paragraph}</w:p>"
+            if raw
+            else f"<w:p><w:r><w:t>{escape(paragraph)}</w:t></w:r></w:p>"
+        )
+        for paragraph in paragraphs
+    )
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", "<Types/>")
+        archive.writestr(
+            "word/document.xml",
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f"<w:body>{body}</w:body></w:document>",
+        )
+        if media_size:
+            archive.writestr("word/media/image1.png", os.urandom(media_size))
+    return out.getvalue()
+
+
+def make_rtf(lines: List[str]) -> bytes:
+    body = "".join(
+        "".join(
+            f"\\u{ord(char)}?" if ord(char) > 127 else char
+            for char in line.replace("\\", "\\\\")
+            .replace("{", "\\{")
+            .replace("}", "\\}")
+        )
+        + "\\par "
+        for line in lines
+    )
+    header = "{\\rtf1\\ansi\\ansicpg1251{\\fonttbl{\\f0 Arial;}}{\\colortbl;\\red0\\green0\\blue0;}"
+    return (header + "\\f0\\fs24 " + body + "}").encode()
+
+
+def make_txt(lines: List[str]) -> bytes:
+    return "".join(line + "\n" for line in lines).encode()
+
+
+def make_html(lines: List[str]) -> bytes:
+    body = "".join(f"<p>{html.escape(line)}</p>" for line in lines)
+    return (
+        "<html><head><title>CV</title><style>p {}</style></head>"
+        f"<body>{body}</body></html>"
+    ).encode()
+
+
+_BUILDERS = {
+    "pdf": make_pdf,
+    "docx": make_docx,
+    "rtf": make_rtf,
+    "txt": make_txt,
+    "html": make_html,
+}
+
+
+def build_document(file_format: Optional[str], text: str) -> bytes:
+    """
+    A file of the given format with the given text. The replay uses it instead of
+    the real (not recorded) files, so the parsers still do their job.
+    """
+    builder = _BUILDERS.get(file_format)
+    if builder is None:
+        # An unsupported file: the parser rejects it, as it did in production
+        return b""
+    return builder(text.splitlines() or [""])
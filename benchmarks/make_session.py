@@ -0,0 +1,222 @@
+"""
+Generates the synthetic traffic recording used by the replay tests (tests/replay/session.jsonl.gz).
+
+    python benchmarks/make_session.py tests/replay/session.jsonl.gz
+
+Candidates go through the real conversation flow (contact, vacancy, resume as a file
+or a link, questions) and arrive at random moments, with random pauses between messages.
+Everything is written through the Recorder, so the file has exactly the redaction and
+the format of a production recording. The same seed gives the same events.
+After regenerating the session, run `make replay-baseline`.
+"""
+
+import argparse
+import os
+import random
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:benchmark")
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+from aiogram.types import Update  # noqa: E402
+from app.bot.keyboards import kb_cancel, kb_contact, kb_vacancies  # noqa: E402
+from app.services.recording import Recorder  # noqa: E402
+
+
+BUTTONS = [
+    button.text
+    for keyboard in (kb_contact, kb_vacancies, kb_cancel)
+    for row in keyboard.keyboard
+    for button in row
+]
+SKILLS = ["Python", "FastAPI", "Redis", "PostgreSQL", "Docker", "asyncio", "Django"]
+SKILLS += ["Java", "PHP", "Kubernetes"]
+WORDS = (
+    "developer built service team worked years experience backend project "
+    "led migrated designed api queue cache"
+).split()
+FORMATS = [
+    ("pdf", "application/pdf", ".pdf"),
+    (
+        "docx",
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        ".docx",
+    ),
+    ("rtf", "application/rtf", ".rtf"),
+    ("txt", "text/plain", ".txt"),
+    ("html", "text/html", ".html"),
+]
+NAMES = ["Ivan", "Anna", "Olga", "Petr", "Maria"]
+QUESTIONS = [
+    "When is the deadline?",
+    "Can I use Django instead of FastAPI?",
+    "What about Redis version 7?",
+    "Thanks!",
+    "Is there a team lead interview?",
+]
+
+
+class SessionGenerator:
+    def __init__(self, seed: int):
+        self.random = random.Random(seed)
+        self.update_id = 1000
+        self.message_id = 1
+
+    def resume(self, lines: int) -> str:
+        return "\n".join(
+            " ".join(
+                self.random.choice(WORDS + SKILLS)
+                for _ in range(self.random.randint(6, 14))
+            )
+            + f" 20{self.random.randint(10, 24)}."
+            for _ in range(lines)
+        )
+
+    def answer(self, accepted: bool) -> str:
+        words = " ".join(
+            self.random.choice(WORDS) for _ in range(self.random.randint(30, 80))
+        )
+        if accepted:
+            return f"Great, {words}. Link to Test Case. 72 hours."
+        return f"Thank you, {words}."
+
+    def message(self, user: dict, **fields) -> dict:
+        self.update_id += 1
+        self.message_id += 1
+        person = {"first_name": user["name"], "username": user["name"].lower()}
+        data = {
+            "update_id": self.update_id,
+            "message": {
+                "message_id": self.message_id,
+                "date": 1760000000 + self.update_id,
+                "chat": {"id": user["id"], "type": "private", **person},
+                "from": {
+                    "id": user["id"],
+                    "is_bot": False,
+                    "last_name": "Doe",
+                    **person,
+                },
+                **fields,
+            },
+        }
+        return Update.model_validate(data).model_dump(mode="json", exclude_none=True)
+
+    def conversation(self, number: int, user: dict) -> list:
+        """
+        (update, events the bot records while handling it) for every message of a candidate.
+        The candidate number picks the path: a link, a file of each format, a scan,
+        an unsupported file, an extra-long resume...
+        """
+        steps = [(self.message(user, text="/start"), [])]
+        if number % 5 == 0:
+            steps.append((self.message(user, text="hello, what is the salary?"), []))
+        contact = {
+            "phone_number": f"+7900{self.random.randint(1000000, 9999999)}",
+            "first_name": user["name"],
+            "user_id": user["id"],
+        }
+        steps.append((self.message(user, contact=contact), []))
+        steps.append((self.message(user, text="🐍 Python Backend Developer"), []))
+        if number % 4 == 1:
+            ai = ("ai", "fast", self.answer(False), self.random.uniform(0.4, 1.2))
+            steps.append((self.message(user, text="Do you have remote work?"), [ai]))
+
+        accepted = number % 3 != 2
+        if number % 6 == 3:
+            found = number % 12 != 3
+            text = self.resume(self.random.randint(20, 60)) if found else None
+            events = [("url", text)]
+            if found:
+                latency = self.random.uniform(1.5, 4)
+                events.append(("ai", "strong", self.answer(accepted), latency))
+            link = f"https://hh.ru/resume/{self.random.randint(10**8, 10**9)}"
+            steps.append((self.message(user, text=link), events))
+        elif number % 10 == 7:
+            image = {
+                "file_id": f"img{number}",
+                "file_unique_id": f"img{number}",
+                "file_name": "photo.png",
+                "mime_type": "image/png",
+                "file_size": 52000,
+            }
+            steps.append((self.message(user, document=image), []))
+        else:
+            file_format, mime_type, extension = FORMATS[number % len(FORMATS)]
+            lines = 2000 if number == 8 else self.random.randint(20, 80)
+            scan = number == 14
+            text = "" if scan else self.resume(lines)
+            document = {
+                "file_id": f"doc{number}",
+                "file_unique_id": f"doc{number}",
+                "file_name": f"{user['name']} CV{extension}",
+                "mime_type": mime_type,
+                "file_size": len(text) + 3000,
+            }
+            events = [("document", file_format, len(text) + 3000, text)]
+            if not scan:
+                latency = self.random.uniform(1.5, 4)
+                events.append(("ai", "strong", self.answer(accepted), latency))
+            steps.append((self.message(user, document=document), events))
+
+        for _ in range(self.random.randint(1, 4)):
+            ai = ("ai", "fast", self.answer(False), self.random.uniform(0.3, 1.5))
+            question = self.random.choice(QUESTIONS)
+            steps.append((self.message(user, text=question), [ai]))
+        return steps
+
+    def timeline(self, users: int) -> list:
+        """
+        Candidates start within the first two minutes, with 3-40s between their messages.
+        """
+        steps = []
+        for number in range(users):
+            user = {"id": 100000 + number * 7919, "name": self.random.choice(NAMES)}
+            at = self.random.uniform(0, 120)
+            for step in self.conversation(number, user):
+                steps.append((at, step))
+                at += self.random.uniform(3, 40)
+        steps.sort(key=lambda item: item[0])
+        return steps
+
+
+def generate(path: str, users: int = 30, seed: int = 32):
+    generator = SessionGenerator(seed)
+    timeline = generator.timeline(users)
+    # The recorder appends, so an old session would be mixed in
+    if os.path.exists(path):
+        os.remove(path)
+
+    # The recorder takes event times from time.monotonic: here it follows the timeline
+    clock = 0.0
+    with patch("time.monotonic", lambda: clock):
+        recorder = Recorder()
+        recorder.start(path, keep_texts=BUTTONS, salt=seed.to_bytes(16, "big"))
+        for clock, (update, events) in timeline:
+            recorder.record_update(update)
+            for event in events:
+                clock += 0.01
+                if event[0] == "document":
+                    recorder.record_document(*event[1:])
+                elif event[0] == "url":
+                    recorder.record_url(event[1])
+                else:
+                    # Gemini answers after its latency
+                    clock += event[3]
+                    recorder.record_ai(*event[1:])
+        recorder.stop()
+    print(f"{len(timeline)} updates written to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--users", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=32)
+    args = parser.parse_args()
+    generate(args.path, users=args.users, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
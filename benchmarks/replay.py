@@ -0,0 +1,398 @@
+"""
+Replays a traffic recording (see app/services/recording.py) through the bot's dispatcher
+with the network stubbed out, and checks latency and memory against a baseline.
+
+    make replay
+    make replay-baseline
+
+Test tooling: it stubs Telegram, Gemini and HTTP, so it lives outside the app package.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import math
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import Counter, defaultdict, deque
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import List
+from unittest.mock import patch
+import httpx
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.methods import GetFile, SendMessage
+from aiogram.types import Chat, File, Message, Update
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BOT_TOKEN", "123:benchmark")
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+from app.bot.dispatcher import create_dispatcher  # noqa: E402
+from app.services import parser  # noqa: E402
+from app.services.ai import CircuitBreaker, TierStats, ai_service  # noqa: E402
+from app.services.candidates import SQLiteBackend, candidate_store  # noqa: E402
+from app.services.load import load_monitor  # noqa: E402
+from app.services.recording import read_recording  # noqa: E402
+from benchmarks.documents import build_document  # noqa: E402
+
+
+# Captured before the replay patches them with the virtual clock
+_real_monotonic = time.monotonic
+_real_perf_counter = time.perf_counter
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop whose clock skips idle time: when nothing is ready to run and no executor
+    thread is busy, it jumps to the next timer instead of sleeping. Our code and the
+    parsers in threads still take real time, so minutes of recorded traffic with all
+    its pauses and Gemini latencies replay in seconds, and a slow handler is still slow.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.skipped = 0.0
+        self._threads = 0
+        select = self._selector.select
+
+        def fast_forward(timeout=None):
+            if timeout and self._threads == 0:
+                self.skipped += timeout
+                timeout = 0
+            return select(timeout)
+
+        self._selector.select = fast_forward
+
+    def time(self) -> float:
+        return _real_monotonic() + self.skipped
+
+    def run_in_executor(self, executor, func, *args):
+        future = super().run_in_executor(executor, func, *args)
+        self._threads += 1
+        future.add_done_callback(self._thread_done)
+        return future
+
+    def _thread_done(self, future):
+        self._threads -= 1
+
+
+class ReplaySession(BaseSession):
+    """
+    Telegram API stub: answers every method without the network
+    and serves the recorded documents for downloads.
+    """
+
+    def __init__(self, documents: deque):
+        super().__init__()
+        self.documents = documents
+        self.requests = Counter()
+        self._message_ids = itertools.count(1)
+
+    async def close(self):
+        pass
+
+    async def make_request(self, bot, method, timeout=None):
+        self.requests[type(method).__name__] += 1
+
+        if isinstance(method, GetFile):
+            return File(
+                file_id=method.file_id,
+                file_unique_id=method.file_id,
+                file_path=method.file_id,
+            )
+        if isinstance(method, SendMessage):
+            return Message(
+                message_id=next(self._message_ids),
+                date=datetime.now(timezone.utc),
+                chat=Chat(id=method.chat_id, type="private"),
+                text=method.text,
+            ).as_(bot)
+        return True
+
+    async def stream_content(
+        self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True
+    ):
+        yield self.documents.popleft() if self.documents else b""
+
+
+class ReplayModel:
+    """
+    Gemini stub: returns the recorded answers of a tier in order, after the recorded latency.
+    Hedged duplicates weren't recorded, they get the median latency.
+    """
+
+    def __init__(self, responses: deque):
+        self.responses = responses
+        self.median_latency = statistics.median(
+            [latency for _, latency in responses] or [0]
+        )
+
+    async def generate_content_async(self, prompt):
+        if self.responses:
+            text, latency = self.responses.popleft()
+        else:
+            text, latency = "...", self.median_latency
+        await asyncio.sleep(latency)
+        return SimpleNamespace(text=text, usage_metadata=None)
+
+
+def _update_kind(update: Update) -> str:
+    message = update.message
+    if message is None:
+        return update.event_type
+    if message.document:
+        return "document"
+    if message.contact:
+        return "contact"
+    text = message.text or ""
+    if text.startswith("/"):
+        return "command"
+    if text.startswith("http"):
+        return "link"
+    return "text"
+
+
+def calibrate(rounds: int = 9) -> float:
+    """
+    Time of a fixed CPU workload on this machine. The replay's real time is divided by it,
+    so the baseline doesn't depend much on how fast the CI runner is.
+    """
+    payload = json.dumps([{"id": i, "text": "x" * 50} for i in range(2000)])
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(5):
+            hashlib.sha256(json.dumps(json.loads(payload)).encode()).hexdigest()
+        timings.append(time.perf_counter() - started)
+    # The fastest round is the least disturbed by other processes
+    return min(timings)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(math.ceil(q * len(ordered)) - 1, 0))]
+
+
+_dispatcher = None
+
+
+def _get_dispatcher():
+    """
+    The handlers router can be attached to one dispatcher only, so it's built once.
+    """
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = create_dispatcher(MemoryStorage(), load_monitor)
+    # A clean FSM for every replay
+    _dispatcher.fsm.storage = MemoryStorage()
+    return _dispatcher
+
+
+async def _replay(events: List[dict], speedup: float, trace_memory: bool) -> dict:
+    """
+    Starts every recorded update as a task at its recorded moment (divided by `speedup`),
+    like polling does, so concurrent conversations overlap as they did in production.
+    """
+    loop = asyncio.get_running_loop()
+    dp = _get_dispatcher()
+    documents = deque(
+        build_document(event["format"], event["text"])
+        for event in events
+        if event["type"] == "document"
+    )
+    pages = deque(event["text"] for event in events if event["type"] == "url")
+    answers = defaultdict(deque)
+    for event in events:
+        if event["type"] == "ai":
+            answers[event["tier"]].append((event["text"], event["latency"]))
+
+    session = ReplaySession(documents)
+    bot = Bot(token="123456:replay", session=session)
+    real_client = httpx.AsyncClient
+
+    def serve_page(request: httpx.Request) -> httpx.Response:
+        text = pages.popleft() if pages else None
+        if not text:
+            return httpx.Response(404)
+        return httpx.Response(200, content=build_document("html", text))
+
+    def client_factory(**kwargs):
+        return real_client(transport=httpx.MockTransport(serve_page), **kwargs)
+
+    latencies = defaultdict(list)
+    started_at = loop.time()
+
+    async def feed(event: dict):
+        await asyncio.sleep(started_at + event["t"] / speedup - loop.time())
+        update = Update.model_validate(event["data"], context={"bot": bot})
+        started = loop.time()
+        await dp.feed_update(bot, update)
+        latencies[_update_kind(update)].append(loop.time() - started)
+
+    with ExitStack() as stack:
+        # Breakers, hedging and the load monitor must see the virtual time too
+        stack.enter_context(patch("time.monotonic", loop.time))
+        stack.enter_context(patch("time.perf_counter", loop.time))
+        stack.enter_context(
+            patch.object(candidate_store, "backend", SQLiteBackend(":memory:"))
+        )
+        stack.enter_context(
+            patch.object(
+                candidate_store, "queue", asyncio.Queue(candidate_store.queue.maxsize)
+            )
+        )
+        stack.enter_context(patch.object(parser.httpx, "AsyncClient", client_factory))
+        for name, tier in ai_service.tiers.items():
+            breaker = CircuitBreaker(
+                tier.breaker.failure_threshold, tier.breaker.reset_timeout
+            )
+            stack.enter_context(patch.object(tier, "model", ReplayModel(answers[name])))
+            stack.enter_context(patch.object(tier, "stats", TierStats()))
+            stack.enter_context(patch.object(tier, "breaker", breaker))
+        stack.enter_context(
+            patch.object(load_monitor, "lags", deque(maxlen=load_monitor.lags.maxlen))
+        )
+        stack.enter_context(patch.object(load_monitor, "shed", 0))
+
+        await candidate_store.start()
+        load_monitor.start()
+        if trace_memory:
+            tracemalloc.start()
+        wall_started = _real_perf_counter()
+        try:
+            await asyncio.gather(
+                *(feed(event) for event in events if event["type"] == "update")
+            )
+            result = {
+                "latencies": latencies,
+                "duration": loop.time() - started_at,
+                "wall": _real_perf_counter() - wall_started,
+                "peak_memory": tracemalloc.get_traced_memory()[1],
+                "shed": load_monitor.shed,
+                "hedged": sum(tier.stats.hedged for tier in ai_service.tiers.values()),
+                "requests": dict(sorted(session.requests.items())),
+            }
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+            await load_monitor.stop()
+            await candidate_store.stop()
+    return result
+
+
+def replay(path: str, speedup: float = 1.0) -> dict:
+    """
+    Replays the recording and returns latency, CPU and memory stats.
+    speedup > 1 makes the traffic denser than it was, e.g. 5 for a load test.
+    """
+    events = list(read_recording(path))
+    with asyncio.Runner(loop_factory=VirtualTimeLoop) as runner:
+        timing = runner.run(_replay(events, speedup, trace_memory=False))
+    # tracemalloc slows down every allocation, so memory is measured in a pass of its own
+    with asyncio.Runner(loop_factory=VirtualTimeLoop) as runner:
+        memory = runner.run(_replay(events, speedup, trace_memory=True))
+
+    calibration = calibrate()
+    latencies = timing["latencies"]
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "updates": len(all_latencies),
+        # Recorded (virtual) seconds of traffic and real seconds it took to replay them
+        "duration": round(timing["duration"], 1),
+        "wall": round(timing["wall"], 3),
+        "calibration": round(calibration, 6),
+        "cpu": round(timing["wall"] / calibration, 1),
+        # Seconds from an update to its handler's end, Gemini latency included
+        "latency_p50": round(_percentile(all_latencies, 0.5), 4),
+        "latency_p95": round(_percentile(all_latencies, 0.95), 4),
+        "latency_by_kind": {
+            kind: round(_percentile(values, 0.95), 4)
+            for kind, values in sorted(latencies.items())
+        },
+        "shed": timing["shed"],
+        "hedged": timing["hedged"],
+        "peak_memory": memory["peak_memory"],
+        "requests": timing["requests"],
+    }
+
+
+# Metrics compared with the baseline. cpu is the real time of the replay
+# in calibration units, so it doesn't depend much on how fast the machine is
+BASELINE_METRICS = ("latency_p95", "cpu", "peak_memory")
+DEFAULT_THRESHOLDS = {"latency_p95": 0.25, "cpu": 1.0, "peak_memory": 0.2}
+
+
+def check_baseline(report: dict, baseline: dict) -> List[str]:
+    """
+    Returns a description of every metric that grew above baseline * (1 + threshold).
+    """
+    regressions = []
+    for metric in BASELINE_METRICS:
+        threshold = baseline["thresholds"][metric]
+        limit = baseline[metric] * (1 + threshold)
+        if report[metric] > limit:
+            regressions.append(
+                f"{metric}: {report[metric]} > {baseline[metric]} (+{threshold:.0%})"
+            )
+    if report["updates"] != baseline["updates"]:
+        regressions.append(
+            f"updates: {report['updates']} processed, {baseline['updates']} expected"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("recording")
+    parser.add_argument(
+        "--speedup",
+        type=float,
+        default=1.0,
+        help="divide the recorded pauses between updates, e.g. 5 for 5x more traffic",
+    )
+    parser.add_argument("--baseline")
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="write the current results to --baseline",
+    )
+    args = parser.parse_args()
+
+    report = replay(args.recording, speedup=args.speedup)
+    print(json.dumps(report, indent=2))
+
+    if not args.baseline:
+        return
+
+    if args.update_baseline:
+        try:
+            with open(args.baseline) as file:
+                thresholds = json.load(file)["thresholds"]
+        except FileNotFoundError:
+            thresholds = DEFAULT_THRESHOLDS
+        baseline = {metric: report[metric] for metric in BASELINE_METRICS}
+        baseline.update(updates=report["updates"], thresholds=thresholds)
+        with open(args.baseline, "w") as file:
+            json.dump(baseline, file, indent=2)
+            file.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    with open(args.baseline) as file:
+        regressions = check_baseline(report, json.load(file))
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -41,3 +41,126 @@ def mock_state():
     state.update_data = AsyncMock(side_effect=update_data)
     state.get_data = AsyncMock(side_effect=get_data)
     return state
+
+
+class FakeRedis:
+    """
+    In-memory subset of redis.asyncio.Redis (decode_responses=True)
+    with the commands the Broadcaster uses.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.ttl = {}
+
+    def pipeline(self, transaction: bool = True):
+        return FakePipeline(self)
+
+    def _drop_empty(self, key):
+        if not self.data.get(key, True):
+            del self.data[key]
+
+    async def exists(self, *keys):
+        return sum(key in self.data for key in keys)
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def expire(self, key, seconds):
+        self.ttl[key] = seconds
+        return key in self.data
+
+    async def hset(self, key, mapping):
+        self.data.setdefault(key, {}).update({k: str(v) for k, v in mapping.items()})
+        return len(mapping)
+
+    async def hget(self, key, field):
+        return self.data.get(key, {}).get(str(field))
+
+    async def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    async def hincrby(self, key, field, amount=1):
+        values = self.data.setdefault(key, {})
+        values[str(field)] = str(int(values.get(str(field), 0)) + amount)
+        return int(values[str(field)])
+
+    async def rpush(self, key, *values):
+        items = self.data.setdefault(key, [])
+        items.extend(str(value) for value in values)
+        return len(items)
+
+    async def llen(self, key):
+        return len(self.data.get(key, []))
+
+    async def lmove(self, source, destination, wherefrom, whereto):
+        items = self.data.get(source)
+        if not items:
+            return None
+        value = items.pop(0) if wherefrom == "LEFT" else items.pop()
+        self._drop_empty(source)
+        target = self.data.setdefault(destination, [])
+        if whereto == "LEFT":
+            target.insert(0, value)
+        else:
+            target.append(value)
+        return value
+
+    async def lrem(self, key, count, value):
+        items = self.data.get(key, [])
+        removed = 0
+        while str(value) in items and (count == 0 or removed < count):
+            items.remove(str(value))
+            removed += 1
+        self._drop_empty(key)
+        return removed
+
+    async def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(members)
+        return len(members)
+
+    async def srem(self, key, *members):
+        self.data.get(key, set()).difference_update(members)
+        self._drop_empty(key)
+        return len(members)
+
+    async def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+
+class FakePipeline:
+    """
+    Queues commands and runs them one after another on execute(),
+    which is atomic enough for a single event loop.
+    """
+
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.commands.clear()
+
+    def __getattr__(self, name):
+        method = getattr(self.redis, name)
+
+        def queue(*args, **kwargs):
+            self.commands.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        results = [
+            await method(*args, **kwargs) for method, args, kwargs in self.commands
+        ]
+        self.commands.clear()
+        return results
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
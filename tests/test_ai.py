@@ -0,0 +1,162 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.services.ai import AIService, CircuitBreaker, FALLBACK_REPLY
+
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_response(text: str):
+    response = MagicMock()
+    response.text = text
+    response.usage_metadata.prompt_token_count = 1000
+    response.usage_metadata.candidates_token_count = 100
+    return response
+
+
+@pytest.fixture
+def service():
+    service = AIService()
+    for tier in service.tiers.values():
+        tier.model = MagicMock()
+    return service
+
+
+async def test_routes_to_requested_tier(service):
+    service.tiers["fast"].model.generate_content_async = AsyncMock(
+        return_value=make_response("fast answer")
+    )
+    service.tiers["strong"].model.generate_content_async = AsyncMock(
+        return_value=make_response("strong answer")
+    )
+
+    assert await service.generate_response("Hi") == "fast answer"
+    assert await service.generate_response("CV", tier="strong") == "strong answer"
+
+    stats = service.get_stats()
+    assert stats["fast"]["requests"] == 1
+    assert stats["strong"]["requests"] == 1
+    assert stats["strong"]["cost_usd"] > stats["fast"]["cost_usd"] > 0
+
+
+@patch("app.services.ai.settings.AI_HEDGE_DEFAULT_DELAY", 0.01)
+async def test_slow_request_is_hedged(service):
+    calls = 0
+
+    async def generate(prompt):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(1)
+            return make_response("slow")
+        return make_response("hedged")
+
+    service.tiers["fast"].model.generate_content_async = generate
+
+    assert await service.generate_response("Hi") == "hedged"
+    assert service.tiers["fast"].stats.hedged == 1
+
+
+async def test_strong_tier_falls_back_to_fast(service):
+    service.tiers["strong"].model.generate_content_async = AsyncMock(
+        side_effect=Exception("503")
+    )
+    service.tiers["fast"].model.generate_content_async = AsyncMock(
+        return_value=make_response("fast answer")
+    )
+
+    reply = await service.generate_response("CV", tier="strong")
+    assert reply == "fast answer"
+    # The fast tier did analyze the resume, so its answer is a real one
+    assert not reply.is_fallback
+    assert service.tiers["strong"].stats.fallbacks == 1
+
+
+async def test_open_breaker_returns_template(service):
+    fast = service.tiers["fast"]
+    fast.model.generate_content_async = AsyncMock(side_effect=Exception("503"))
+
+    for _ in range(fast.breaker.failure_threshold):
+        assert await service.generate_response("Hi") == FALLBACK_REPLY
+
+    assert fast.breaker.state == "open"
+    fast.model.generate_content_async.reset_mock()
+
+    reply = await service.generate_response("Hi")
+    assert reply == FALLBACK_REPLY
+    assert reply.is_fallback
+    fast.model.generate_content_async.assert_not_called()
+
+
+async def test_breaker_half_open_after_timeout():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.state == "half_open"
+    assert breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+async def test_breaker_half_open_lets_one_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.release_probe()
+    assert breaker.allow_request()
+
+
+@patch("app.services.ai.settings.AI_HEDGE_DEFAULT_DELAY", 0.05)
+async def test_hedged_loser_stays_in_latency_window(service):
+    calls = 0
+
+    async def generate(prompt):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(1)
+        return make_response("answer")
+
+    service.tiers["fast"].model.generate_content_async = generate
+
+    await service.generate_response("Hi")
+
+    latencies = sorted(service.tiers["fast"].stats.latencies)
+    assert len(latencies) == 2
+    assert latencies[1] >= 0.05
+
+
+@patch("app.services.ai.settings.AI_REQUEST_TIMEOUT", 0.01)
+async def test_timeout_stays_in_latency_window(service):
+    async def generate(prompt):
+        await asyncio.sleep(1)
+
+    service.tiers["fast"].model.generate_content_async = generate
+
+    assert await service.generate_response("Hi") == FALLBACK_REPLY
+    assert len(service.tiers["fast"].stats.latencies) == 1
+
+
+@patch("app.services.ai.settings.AI_HEDGE_DEFAULT_DELAY", 1)
+async def test_cancel_during_hedge_delay_cancels_request(service):
+    started = asyncio.Event()
+
+    async def generate(prompt):
+        started.set()
+        await asyncio.sleep(10)
+
+    service.tiers["fast"].model.generate_content_async = generate
+    task = asyncio.create_task(service.generate_response("Hi"))
+    await started.wait()
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert asyncio.all_tasks() == {asyncio.current_task()}
+    assert service.tiers["fast"].breaker.allow_request()
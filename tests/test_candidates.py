@@ -0,0 +1,178 @@
+import json
+import sqlite3
+import pytest
+from datetime import date
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import SecretStr
+from app.api.candidates import router
+from app.services.candidates import CandidateStore, SQLiteBackend, extract_skills
+
+
+def make_record(user_id: int, verdict: str, skills: list, created_at: str) -> dict:
+    return {
+        "user_id": user_id,
+        "first_name": "Ivan",
+        "last_name": None,
+        "phone": "+123456789",
+        "source": "file",
+        "verdict": verdict,
+        "resume_text": "...",
+        "skills": skills,
+        "created_at": created_at,
+    }
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "candidates.sqlite3"))
+    backend.init()
+    yield backend
+    backend.close()
+
+
+def test_extract_skills():
+    skills = extract_skills("Python developer: FastAPI, Redis, C#. Let's go!")
+
+    assert skills == ["python", "fastapi", "redis", "c#"]
+
+
+def test_query_filters(backend):
+    backend.insert_many(
+        [
+            make_record(
+                1, "accepted", ["python", "redis"], "2025-01-01T10:00:00+00:00"
+            ),
+            make_record(2, "rejected", ["java"], "2025-01-02T10:00:00+00:00"),
+            make_record(3, "accepted", ["python"], "2025-01-03T10:00:00+00:00"),
+        ]
+    )
+
+    items, _ = backend.query(skill="Python")
+    assert [item["user_id"] for item in items] == [3, 1]
+
+    items, _ = backend.query(verdict="rejected")
+    assert [item["user_id"] for item in items] == [2]
+
+    items, _ = backend.query(date_from=date(2025, 1, 2), date_to=date(2025, 1, 2))
+    assert [item["user_id"] for item in items] == [2]
+
+    items, _ = backend.query(skill="redis", verdict="accepted")
+    assert items[0]["skills"] == ["python", "redis"]
+
+
+def test_query_pagination(backend):
+    backend.insert_many(
+        [
+            make_record(i, "accepted", ["python"], f"2025-01-01T10:00:{i:02d}+00:00")
+            for i in range(5)
+        ]
+    )
+
+    first_page, cursor = backend.query(skill="python", limit=3)
+    second_page, last_cursor = backend.query(skill="python", cursor=cursor, limit=3)
+
+    assert [item["user_id"] for item in first_page] == [4, 3, 2]
+    assert [item["user_id"] for item in second_page] == [1, 0]
+    assert last_cursor is None
+
+
+async def test_store_writes_in_batches(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "candidates.sqlite3"))
+    store = CandidateStore(backend, batch_size=2, flush_interval=10)
+
+    with patch.object(backend, "insert_many", wraps=backend.insert_many) as insert:
+        await store.start()
+        for user_id in range(3):
+            await store.save(
+                user_id=user_id, source="link", verdict="accepted", resume_text="Python"
+            )
+        await store.stop()
+
+    assert [len(call.args[0]) for call in insert.call_args_list] == [2, 1]
+
+    backend.init()
+    items, _ = backend.query()
+    assert [item["user_id"] for item in items] == [2, 1, 0]
+
+
+async def test_store_retries_failed_batch(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "candidates.sqlite3"))
+    store = CandidateStore(backend, flush_interval=0.01, retry_delay=0.001)
+    insert_many = backend.insert_many
+    errors = [sqlite3.OperationalError("database is locked")] * 2
+
+    def flaky_insert(records):
+        if errors:
+            raise errors.pop()
+        insert_many(records)
+
+    with patch.object(backend, "insert_many", side_effect=flaky_insert):
+        await store.start()
+        await store.save(user_id=1, source="link", verdict="accepted", resume_text="")
+        await store.stop()
+
+    backend.init()
+    items, _ = backend.query()
+    assert [item["user_id"] for item in items] == [1]
+
+
+async def test_store_dumps_batch_it_cannot_write(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "candidates.sqlite3"))
+    failed_path = tmp_path / "failed.jsonl"
+    store = CandidateStore(
+        backend, flush_interval=0.01, retry_delay=0.001, failed_path=str(failed_path)
+    )
+
+    with patch.object(
+        backend, "insert_many", side_effect=sqlite3.OperationalError("disk I/O error")
+    ) as insert:
+        await store.start()
+        for user_id in range(2):
+            await store.save(
+                user_id=user_id, source="file", verdict="pending", resume_text="Python"
+            )
+        await store.stop()
+
+    assert insert.call_count == store.write_retries + 1
+    records = [json.loads(line) for line in failed_path.read_text().splitlines()]
+    assert [record["user_id"] for record in records] == [0, 1]
+    assert records[0]["skills"] == ["python"]
+
+
+def test_date_filter_same_second(backend):
+    backend.insert_many(
+        [
+            make_record(1, "accepted", [], "2025-01-01T23:59:59+00:00"),
+            make_record(2, "accepted", [], "2025-01-02T00:00:00+00:00"),
+            make_record(3, "accepted", [], "2025-01-02T00:00:00+00:00"),
+        ]
+    )
+
+    items, _ = backend.query(date_from=date(2025, 1, 2))
+    assert [item["user_id"] for item in items] == [3, 2]
+
+
+@patch("app.api.deps.settings.ADMIN_TOKEN", SecretStr("secret"))
+def test_candidates_api(backend):
+    backend.insert_many(
+        [make_record(1, "accepted", ["python"], "2025-01-01T10:00:00+00:00")]
+    )
+    store = CandidateStore(backend)
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    with patch("app.api.candidates.candidate_store", store):
+        assert client.get("/candidates").status_code == 401
+
+        response = client.get(
+            "/candidates",
+            params={"skill": "python"},
+            headers={"X-Admin-Token": "secret"},
+        )
+
+    assert response.status_code == 200
+    assert response.json()["items"][0]["user_id"] == 1
+    assert response.json()["next_cursor"] is None
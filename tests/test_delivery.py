@@ -0,0 +1,253 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import SecretStr
+from app.api.broadcasts import router
+from app.services.delivery import Broadcaster, ChatPacer, TokenBucket
+
+
+def make_broadcaster(send_message, redis=None, rate=1000) -> Broadcaster:
+    bot = AsyncMock()
+    bot.send_message = send_message
+    return Broadcaster(
+        redis or AsyncMock(),
+        bot,
+        rate=rate,
+        chat_interval=0.05,
+        group_interval=0.1,
+        concurrency=2,
+    )
+
+
+async def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=100)
+
+    started = time.monotonic()
+    for _ in range(11):
+        await bucket.acquire()
+
+    assert time.monotonic() - started >= 0.09
+
+
+async def test_token_bucket_pause():
+    bucket = TokenBucket(rate=1000)
+    bucket.pause(0.05)
+
+    started = time.monotonic()
+    await bucket.acquire()
+
+    assert time.monotonic() - started >= 0.05
+
+
+async def test_chat_pacer():
+    pacer = ChatPacer(interval=0.05, group_interval=0.1)
+
+    started = time.monotonic()
+    await pacer.wait(1)
+    await pacer.wait(2)
+    assert time.monotonic() - started < 0.05
+
+    await pacer.wait(1)
+    assert time.monotonic() - started >= 0.05
+
+
+async def test_deliver_sent():
+    broadcaster = make_broadcaster(AsyncMock())
+
+    await broadcaster._deliver("b1", 42, "New vacancy")
+
+    broadcaster.bot.send_message.assert_called_with(42, "New vacancy")
+    broadcaster.redis.hincrby.assert_called_with("broadcast:b1", "sent", 1)
+
+
+async def test_deliver_retry_after_requeues_and_pauses():
+    broadcaster = make_broadcaster(
+        AsyncMock(
+            side_effect=TelegramRetryAfter(method=None, message="", retry_after=5)
+        )
+    )
+
+    await broadcaster._deliver("b1", 42, "New vacancy")
+
+    broadcaster.redis.rpush.assert_called_with("broadcast:b1:pending", 42)
+    assert broadcaster.bucket.paused_until > time.monotonic() + 4
+
+
+async def test_deliver_blocked_user_fails():
+    broadcaster = make_broadcaster(
+        AsyncMock(side_effect=TelegramForbiddenError(method=None, message="blocked"))
+    )
+
+    await broadcaster._deliver("b1", 42, "New vacancy")
+
+    broadcaster.redis.hincrby.assert_called_with("broadcast:b1", "failed", 1)
+    broadcaster.redis.rpush.assert_not_called()
+
+
+async def test_deliver_network_error_retries():
+    broadcaster = make_broadcaster(AsyncMock(side_effect=Exception("timeout")))
+    broadcaster.redis.hincrby = AsyncMock(return_value=1)
+
+    await broadcaster._deliver("b1", 42, "New vacancy")
+
+    broadcaster.redis.rpush.assert_called_with("broadcast:b1:pending", 42)
+
+
+async def test_worker_moves_chats_through_processing():
+    broadcaster = make_broadcaster(AsyncMock())
+    broadcaster.redis.lmove = AsyncMock(side_effect=["1", "2", None])
+
+    await broadcaster._worker("b1", "New vacancy")
+
+    assert broadcaster.bot.send_message.call_count == 2
+    broadcaster.redis.lrem.assert_called_with("broadcast:b1:processing", 1, "2")
+
+
+async def wait_for_status(broadcaster: Broadcaster, broadcast_id: str, status: str):
+    for _ in range(100):
+        progress = await broadcaster.get_progress(broadcast_id)
+        if progress["status"] == status:
+            return progress
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Broadcast is still {progress['status']}")
+
+
+async def test_broadcast_progress(fake_redis):
+    broadcaster = make_broadcaster(AsyncMock(), fake_redis)
+
+    broadcast_id = await broadcaster.create("New vacancy", [1, 2, 2, 3])
+    progress = await wait_for_status(broadcaster, broadcast_id, "done")
+
+    assert progress["total"] == 3
+    assert progress["sent"] == 3
+    assert progress["failed"] == 0
+    assert progress["pending"] == 0
+    assert progress["eta_seconds"] == 0
+    assert await fake_redis.smembers(Broadcaster.ACTIVE_KEY) == set()
+    assert fake_redis.ttl[f"broadcast:{broadcast_id}"] == Broadcaster.RESULT_TTL
+    assert not await fake_redis.exists(f"broadcast:{broadcast_id}:pending")
+
+
+async def test_broadcast_resumes_after_restart(fake_redis):
+    # State left by a crash: chat 1 sent, chat 2 in the middle of sending, chat 3 pending
+    await fake_redis.hset(
+        "broadcast:b1",
+        mapping={
+            "text": "New vacancy",
+            "status": "running",
+            "total": 3,
+            "sent": 1,
+            "failed": 0,
+            "created_at": "2025-01-01T10:00:00+00:00",
+            "started_at": time.time(),
+        },
+    )
+    await fake_redis.rpush("broadcast:b1:pending", 3)
+    await fake_redis.rpush("broadcast:b1:processing", 2)
+    await fake_redis.sadd(Broadcaster.ACTIVE_KEY, "b1")
+
+    broadcaster = make_broadcaster(AsyncMock(), fake_redis)
+    await broadcaster.start()
+    progress = await wait_for_status(broadcaster, "b1", "done")
+    await broadcaster.stop()
+
+    sent_to = sorted(call.args[0] for call in broadcaster.bot.send_message.mock_calls)
+    assert sent_to == [2, 3]
+    assert progress["sent"] == 3
+    assert progress["pending"] == 0
+
+
+async def test_cancel_only_running_broadcast(fake_redis):
+    broadcaster = make_broadcaster(AsyncMock(), fake_redis, rate=5)
+
+    broadcast_id = await broadcaster.create("New vacancy", list(range(1, 20)))
+    await asyncio.sleep(0.01)
+
+    assert await broadcaster.cancel(broadcast_id)
+    progress = await broadcaster.get_progress(broadcast_id)
+    assert progress["status"] == "cancelled"
+    assert progress["sent"] < 19
+
+    assert not await broadcaster.cancel(broadcast_id)
+    assert not await broadcaster.cancel("unknown")
+    await broadcaster.stop()
+
+
+async def test_cancel_finished_broadcast_keeps_status(fake_redis):
+    broadcaster = make_broadcaster(AsyncMock(), fake_redis)
+    broadcast_id = await broadcaster.create("New vacancy", [1])
+    await wait_for_status(broadcaster, broadcast_id, "done")
+    fake_redis.ttl.clear()
+
+    assert not await broadcaster.cancel(broadcast_id)
+
+    assert (await broadcaster.get_progress(broadcast_id))["status"] == "done"
+    assert fake_redis.ttl == {}
+
+
+async def test_cancel_racing_with_finish_keeps_done(fake_redis):
+    broadcaster = make_broadcaster(AsyncMock(), fake_redis)
+    broadcast_id = await broadcaster.create("New vacancy", [1])
+    task = broadcaster._tasks[broadcast_id]
+    hget = fake_redis.hget
+
+    async def slow_hget(key, field):
+        # The status is read, and the broadcast finishes before the reply arrives
+        value = await hget(key, field)
+        if field == "status":
+            await asyncio.wait({task})
+        return value
+
+    fake_redis.hget = slow_hget
+
+    assert not await broadcaster.cancel(broadcast_id)
+    assert (await broadcaster.get_progress(broadcast_id))["status"] == "done"
+
+
+@patch("app.api.deps.settings.ADMIN_TOKEN", SecretStr("secret"))
+def test_broadcasts_api(fake_redis):
+    app = FastAPI()
+    app.include_router(router)
+    headers = {"X-Admin-Token": "secret"}
+
+    with TestClient(app) as client:
+        app.state.broadcaster = make_broadcaster(AsyncMock(), fake_redis)
+
+        assert client.post("/admin/broadcasts", json={"text": "Hi"}).status_code == 401
+
+        with patch(
+            "app.api.broadcasts.candidate_store.select_user_ids",
+            AsyncMock(return_value=[]),
+        ):
+            response = client.post(
+                "/admin/broadcasts",
+                json={"text": "Hi", "verdict": "accepted"},
+                headers=headers,
+            )
+        assert response.status_code == 400
+
+        response = client.post(
+            "/admin/broadcasts",
+            json={"text": "Hi", "chat_ids": [1, 2]},
+            headers=headers,
+        )
+        assert response.status_code == 202
+        broadcast_id = response.json()["id"]
+        assert response.json()["total"] == 2
+
+        for _ in range(100):
+            response = client.get(f"/admin/broadcasts/{broadcast_id}", headers=headers)
+            if response.json()["status"] == "done":
+                break
+            time.sleep(0.01)
+        assert response.json()["sent"] == 2
+
+        response = client.delete(f"/admin/broadcasts/{broadcast_id}", headers=headers)
+        assert response.status_code == 409
+        assert client.get("/admin/broadcasts/nope", headers=headers).status_code == 404
+        assert (
+            client.delete("/admin/broadcasts/nope", headers=headers).status_code == 404
+        )
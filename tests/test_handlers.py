@@ -1,8 +1,10 @@
 import pytest
 from unittest.mock import ANY, patch, AsyncMock
 from aiogram.types import Contact, Document
-from app.bot.handlers import back_to_start, handle_resume_link, handle_resume_pdf
+from app.bot.handlers import back_to_start, handle_resume_link, handle_resume_document
 from app.bot.handlers import cmd_start, handle_contact, handle_any_text, RecruitState
+from app.bot.handlers import TEST_TASK_LINK
+from app.services.ai import template_reply
 
 pytestmark = pytest.mark.asyncio
 
@@ -55,9 +57,12 @@ async def test_ai_chat(mock_ai_service, mock_message, mock_state):
     mock_message.answer.assert_called_with("I am a robot")
 
 
+@patch("app.bot.handlers.candidate_store")
 @patch("app.bot.handlers.ai_service")
 @patch("app.bot.handlers.content_parser")
-async def test_handle_resume_pdf(mock_parser, mock_ai, mock_message, mock_state):
+async def test_handle_resume_document(
+    mock_parser, mock_ai, mock_store, mock_message, mock_state
+):
 
     mock_message.document = Document(
         file_id="123", file_unique_id="abc", mime_type="application/pdf"
@@ -73,13 +78,14 @@ async def test_handle_resume_pdf(mock_parser, mock_ai, mock_message, mock_state)
     long_text = (
         "I am a Senior Python Developer with experience in FastAPI, Redis, Docker. " * 5
     )
-    mock_parser.extract_text_from_pdf = AsyncMock(return_value=long_text)
+    mock_parser.extract_text_from_document = AsyncMock(return_value=long_text)
 
     mock_ai.generate_response = AsyncMock(return_value="Great match!")
+    mock_store.save = AsyncMock()
 
-    from app.bot.handlers import handle_resume_pdf
+    from app.bot.handlers import handle_resume_document
 
-    await handle_resume_pdf(mock_message, mock_bot, mock_state)
+    await handle_resume_document(mock_message, mock_bot, mock_state)
 
     mock_bot.download.assert_called_once()
 
@@ -87,16 +93,27 @@ async def test_handle_resume_pdf(mock_parser, mock_ai, mock_message, mock_state)
 
     mock_message.answer.assert_called_with("Great match!", reply_markup=ANY)
 
+    mock_store.save.assert_called_once()
+    kwargs = mock_store.save.call_args.kwargs
+    assert kwargs["source"] == "file"
+    assert kwargs["verdict"] == "rejected"
+
 
+@patch("app.bot.handlers.candidate_store")
 @patch("app.bot.handlers.ai_service")
 @patch("app.bot.handlers.content_parser")
-async def test_handle_resume_link(mock_parser, mock_ai, mock_message, mock_state):
+async def test_handle_resume_link(
+    mock_parser, mock_ai, mock_store, mock_message, mock_state
+):
     mock_message.text = "https://hh.ru/resume/12345"
 
     long_text = "Experienced Python Backend Developer... " * 10
     mock_parser.extract_text_from_url = AsyncMock(return_value=long_text)
 
-    mock_ai.generate_response = AsyncMock(return_value="Link Analysis Result")
+    mock_ai.generate_response = AsyncMock(
+        return_value=f"Great, here is the test task: {TEST_TASK_LINK}"
+    )
+    mock_store.save = AsyncMock()
 
     await handle_resume_link(mock_message, mock_state)
 
@@ -104,6 +121,27 @@ async def test_handle_resume_link(mock_parser, mock_ai, mock_message, mock_state
     mock_message.answer.assert_called()
     mock_message.delete.assert_not_called()
     mock_state.set_state.assert_called_with(RecruitState.chatting)
+    assert mock_store.save.call_args.kwargs["verdict"] == "accepted"
+
+
+@patch("app.bot.handlers.candidate_store")
+@patch("app.bot.handlers.ai_service")
+@patch("app.bot.handlers.content_parser")
+async def test_template_reply_saved_as_pending(
+    mock_parser, mock_ai, mock_store, mock_message, mock_state
+):
+    mock_message.text = "https://hh.ru/resume/12345"
+    mock_parser.extract_text_from_url = AsyncMock(
+        return_value="Experienced Python Backend Developer... " * 10
+    )
+    mock_ai.generate_response = AsyncMock(
+        return_value=template_reply("I can't analyze it right now.")
+    )
+    mock_store.save = AsyncMock()
+
+    await handle_resume_link(mock_message, mock_state)
+
+    assert mock_store.save.call_args.kwargs["verdict"] == "pending"
 
 
 @patch("app.bot.handlers.content_parser")
@@ -124,7 +162,7 @@ async def test_handle_resume_link_fail(mock_parser, mock_message, mock_state):
 
 @patch("app.bot.handlers.ai_service")
 @patch("app.bot.handlers.content_parser")
-async def test_handle_resume_pdf_scan_error(
+async def test_handle_resume_document_scan_error(
     mock_parser, mock_ai, mock_message, mock_state
 ):
     from aiogram.types import Document
@@ -138,12 +176,12 @@ async def test_handle_resume_pdf_scan_error(
     mock_bot = AsyncMock()
     mock_bot.download.return_value = io.BytesIO(b"scan")
 
-    mock_parser.extract_text_from_pdf = AsyncMock(return_value="Scan")
+    mock_parser.extract_text_from_document = AsyncMock(return_value="Scan")
 
     mock_wait_msg = AsyncMock()
     mock_message.answer = AsyncMock(return_value=mock_wait_msg)
 
-    await handle_resume_pdf(mock_message, mock_bot, mock_state)
+    await handle_resume_document(mock_message, mock_bot, mock_state)
 
     mock_wait_msg.edit_text.assert_called()
     args, _ = mock_wait_msg.edit_text.call_args
@@ -170,11 +208,11 @@ async def test_handle_wrong_mime_type(mock_message, mock_state):
 
     mock_bot = AsyncMock()
 
-    await handle_resume_pdf(mock_message, mock_bot, mock_state)
+    await handle_resume_document(mock_message, mock_bot, mock_state)
 
     mock_message.answer.assert_called()
     args, _ = mock_message.answer.call_args
-    assert "Please send your resume in **PDF**" in args[0]
+    assert "**PDF, DOCX, RTF, TXT or HTML**" in args[0]
 
 
 @patch("app.bot.handlers.ai_service")
@@ -190,3 +228,70 @@ async def test_chat_while_waiting_resume(mock_ai, mock_message, mock_state):
     kwargs = mock_ai.generate_response.call_args.kwargs
 
     assert "instead of a file or link" in kwargs["custom_system_prompt"]
+
+
+@pytest.mark.parametrize(
+    "file_bytes, mime_type, file_name",
+    [
+        (b"%PDF-1.4 resume", "application/octet-stream", None),
+        (b"%PDF-1.4 resume", None, "resume"),
+        (b"{\\rtf1\\ansi resume}", "application/msword", "cv.doc"),
+    ],
+)
+@patch("app.bot.handlers.candidate_store")
+@patch("app.bot.handlers.ai_service")
+async def test_document_format_decided_by_content(
+    mock_ai, mock_store, file_bytes, mime_type, file_name, mock_message, mock_state
+):
+    import io
+
+    mock_message.document = Document(
+        file_id="1", file_unique_id="u", mime_type=mime_type, file_name=file_name
+    )
+    mock_bot = AsyncMock()
+    mock_bot.download.return_value = io.BytesIO(file_bytes)
+    mock_ai.generate_response = AsyncMock(return_value="Great match!")
+    mock_store.save = AsyncMock()
+
+    with patch(
+        "app.bot.handlers.content_parser.extract_text_from_document",
+        AsyncMock(return_value="Python Developer, FastAPI, Redis " * 5),
+    ) as extract:
+        await handle_resume_document(mock_message, mock_bot, mock_state)
+
+    extract.assert_called_once()
+    mock_state.set_state.assert_called_with(RecruitState.chatting)
+
+
+async def test_unsupported_content_after_download(mock_message, mock_state):
+    import io
+
+    mock_message.document = Document(
+        file_id="1", file_unique_id="u", mime_type="application/octet-stream"
+    )
+    mock_bot = AsyncMock()
+    mock_bot.download.return_value = io.BytesIO(b"\x89PNG\r\n\x1a\n")
+    mock_wait_msg = AsyncMock()
+    mock_message.answer = AsyncMock(return_value=mock_wait_msg)
+
+    await handle_resume_document(mock_message, mock_bot, mock_state)
+
+    args, _ = mock_wait_msg.edit_text.call_args
+    assert "**PDF, DOCX, RTF, TXT or HTML**" in args[0]
+    mock_state.set_state.assert_not_called()
+
+
+async def test_too_large_document_not_downloaded(mock_message, mock_state):
+    mock_message.document = Document(
+        file_id="1",
+        file_unique_id="u",
+        mime_type="application/pdf",
+        file_size=50 * 1024 * 1024,
+    )
+    mock_bot = AsyncMock()
+
+    await handle_resume_document(mock_message, mock_bot, mock_state)
+
+    mock_bot.download.assert_not_called()
+    args, _ = mock_message.answer.call_args
+    assert "too large" in args[0]
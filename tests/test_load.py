@@ -0,0 +1,103 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from app.bot.middlewares import AdmissionMiddleware, BUSY_MESSAGE
+from app.services.load import LoadMonitor
+
+
+pytestmark = pytest.mark.asyncio
+
+
+def low_priority_data():
+    handler = AsyncMock()
+    handler.flags = {"priority": "low"}
+    return {"handler": handler}
+
+
+async def test_low_priority_shed_when_overloaded(mock_message):
+    monitor = LoadMonitor(max_loop_lag=0.5, max_in_flight=1)
+    monitor.in_flight = 1
+    middleware = AdmissionMiddleware(monitor)
+    handler = AsyncMock()
+
+    await middleware(handler, mock_message, low_priority_data())
+
+    handler.assert_not_called()
+    mock_message.answer.assert_called_with(BUSY_MESSAGE)
+    assert monitor.shed == 1
+
+
+async def test_high_priority_not_shed(mock_message):
+    monitor = LoadMonitor(max_loop_lag=0.5, max_in_flight=1)
+    monitor.lags.append(2.0)
+    middleware = AdmissionMiddleware(monitor)
+    handler = AsyncMock(return_value="done")
+
+    result = await middleware(handler, mock_message, {})
+
+    assert result == "done"
+    assert monitor.in_flight == 0
+
+
+async def test_drain_waits_for_handlers():
+    monitor = LoadMonitor(max_loop_lag=0.5, max_in_flight=10)
+
+    async def slow_handler():
+        async with monitor.track():
+            await asyncio.sleep(0.05)
+
+    task = asyncio.create_task(slow_handler())
+    await asyncio.sleep(0)
+
+    assert monitor.in_flight == 1
+    assert await monitor.drain(timeout=1)
+    assert not monitor.ready
+    await task
+
+
+async def test_drain_timeout():
+    monitor = LoadMonitor(max_loop_lag=0.5, max_in_flight=10)
+    monitor.in_flight = 1
+    monitor._idle.clear()
+
+    assert not await monitor.drain(timeout=0.01)
+
+
+async def test_loop_lag_sampling():
+    monitor = LoadMonitor(max_loop_lag=0.01, max_in_flight=10, sample_interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.005)
+
+    # Block the loop so the sampler wakes up late
+    import time
+
+    time.sleep(0.05)
+    await asyncio.sleep(0.02)
+    await monitor.stop()
+
+    assert monitor.loop_lag > 0.01
+    assert monitor.overloaded
+
+
+async def test_drain_waits_for_update_tasks():
+    monitor = LoadMonitor(max_loop_lag=0.5, max_in_flight=10)
+    finished = []
+
+    async def update_in_outer_middleware():
+        # E.g. still loading the FSM state: the handler counter is 0
+        await asyncio.sleep(0.05)
+        finished.append(True)
+
+    task = asyncio.create_task(update_in_outer_middleware())
+
+    assert monitor.in_flight == 0
+    assert await monitor.drain(timeout=1, tasks={task})
+    assert finished
+
+
+async def test_drain_update_tasks_timeout():
+    monitor = LoadMonitor(max_loop_lag=0.5, max_in_flight=10)
+    task = asyncio.create_task(asyncio.sleep(1))
+
+    assert not await monitor.drain(timeout=0.01, tasks={task})
+    task.cancel()
@@ -1,9 +1,8 @@
+import tracemalloc
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-from app.services.parser import content_parser
-
-
-pytestmark = pytest.mark.asyncio
+from app.services.parser import ContentParser, content_parser
+from benchmarks.documents import make_docx
 
 
 @patch("app.services.parser.httpx.AsyncClient")
@@ -28,7 +27,7 @@ async def test_extract_text_from_url(mock_client_cls):
 
 
 @patch("app.services.parser.PdfReader")
-async def test_extract_text_from_pdf(mock_pdf_reader):
+async def test_extract_text_from_document_pdf(mock_pdf_reader):
     mock_page = Mock()
     mock_page.extract_text.return_value = "Python Developer Resume"
 
@@ -36,16 +35,20 @@ async def test_extract_text_from_pdf(mock_pdf_reader):
     mock_pdf_instance.pages = [mock_page]
 
     fake_file_content = b"%PDF-1.4..."
-    text = await content_parser.extract_text_from_pdf(fake_file_content)
+    text = await content_parser.extract_text_from_document(
+        fake_file_content, mime_type="application/pdf"
+    )
 
     assert "Python Developer Resume" in text
 
 
 @patch("app.services.parser.PdfReader")
-async def test_extract_text_from_pdf_error(mock_pdf_reader):
+async def test_extract_text_from_document_pdf_error(mock_pdf_reader):
     mock_pdf_reader.side_effect = Exception("Corrupted PDF")
 
-    text = await content_parser.extract_text_from_pdf(b"trash data")
+    text = await content_parser.extract_text_from_document(
+        b"%PDF-1.4 trash data", mime_type="application/pdf"
+    )
 
     assert not text
 
@@ -71,3 +74,116 @@ async def test_extract_text_from_url_404(mock_client_cls):
     text = await content_parser.extract_text_from_url("http://example.com/404")
 
     assert not text
+
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+@pytest.mark.parametrize(
+    "file_bytes, mime_type, file_name, expected",
+    [
+        (b"%PDF-1.4...", "application/octet-stream", None, "pdf"),
+        (make_docx(["Python"]), "application/octet-stream", "cv.docx", "docx"),
+        (b"PK\x03\x04 not a zip", DOCX_MIME, "cv.docx", None),
+        (b"{\\rtf1\\ansi Python}", "application/msword", None, "rtf"),
+        (b"<!DOCTYPE html><html></html>", "text/plain", None, "html"),
+        (b"Python Developer", "text/plain", None, "txt"),
+        (b"Python Developer", "application/octet-stream", "cv.txt", "txt"),
+        (b"Python Developer", "application/pdf", None, None),
+        (b"\xd0\xcf\x11\xe0 old doc", "application/msword", "cv.doc", None),
+    ],
+)
+def test_detect_format(file_bytes, mime_type, file_name, expected):
+    assert content_parser.detect_format(file_bytes, mime_type, file_name) == expected
+
+
+async def test_extract_text_from_docx():
+    docx = make_docx(["Ivan Ivanov", "", "Python, FastAPI & Redis"])
+
+    text = await content_parser.extract_text_from_document(docx, DOCX_MIME)
+
+    assert text == "Ivan Ivanov\nPython, FastAPI & Redis"
+
+
+def test_parse_docx_stops_at_budget():
+    docx = make_docx([f"Paragraph {i}" for i in range(1000)])
+
+    text = content_parser.parse_docx(docx, max_chars=100)
+
+    assert "Paragraph 5" in text
+    assert "Paragraph 100" not in text
+
+
+def test_parse_docx_stops_inside_paragraph():
+    run = "<w:r><w:t>Python FastAPI Redis </w:t><w:tab/></w:r>"
+    docx = make_docx([run * 100_000], raw=True)
+
+    tracemalloc.start()
+    text = content_parser.parse_docx(docx, max_chars=4000)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert 4000 <= len(text) < 4100
+    assert peak < 2 * 1024 * 1024
+
+
+def test_parse_docx_reads_limited_xml(monkeypatch):
+    monkeypatch.setattr(ContentParser, "DOCX_XML_MAX_BYTES", 64 * 1024)
+    docx = make_docx([f"Paragraph {i}" for i in range(100_000)])
+
+    text = content_parser.parse_docx(docx, max_chars=10_000_000)
+
+    assert "Paragraph 500" in text
+    assert "Paragraph 99999" not in text
+
+
+def test_parse_rtf():
+    rtf = (
+        b"{\\rtf1\\ansi\\ansicpg1251{\\fonttbl{\\f0 Times New Roman;}}"
+        b"{\\*\\generator Word;}\\f0 Python \\'f0\\'e0\\'e7\\'f0\\'e0\\'e1\\'ee\\'f2\\'f7\\'e8\\'ea"
+        b"\\par \\u1055?\\u1088?\\u1080?\\u1074?\\u1077?\\u1090?\\par}"
+    )
+
+    assert content_parser.parse_rtf(rtf, max_chars=4000) == (
+        "Python разработчик\nПривет"
+    )
+
+
+def test_parse_txt_cp1251():
+    text = content_parser.parse_txt(
+        "Резюме\r\n\r\nPython".encode("cp1251"), max_chars=4000
+    )
+
+    assert text == "Резюме\nPython"
+
+
+def test_parse_html():
+    html = (
+        b"<html><head><title>CV</title><style>p {}</style></head>"
+        b"<body><h1>Ivan</h1><p>Python &amp; Redis</p><script>alert(1)</script></body></html>"
+    )
+
+    assert content_parser.parse_html(html, max_chars=4000) == "Ivan\nPython & Redis"
+
+
+def test_parse_document_truncates_to_budget():
+    text = content_parser.parse_document(
+        b"Python " * 10_000, mime_type="text/plain", max_chars=100
+    )
+
+    assert len(text) == 100
+
+
+@pytest.mark.parametrize(
+    "mime_type, expected",
+    [
+        ("application/pdf", True),
+        ("application/octet-stream", True),
+        ("application/msword", True),
+        (None, True),
+        ("image/jpeg", False),
+        ("video/mp4", False),
+    ],
+)
+def test_may_be_supported(mime_type, expected):
+    assert content_parser.may_be_supported(mime_type) is expected
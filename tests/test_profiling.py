@@ -0,0 +1,107 @@
+import asyncio
+import time
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import SecretStr
+from app.api.admin import router
+from app.services.profiling import MemoryProfiler, SamplingProfiler
+
+
+def busy_parser():
+    deadline = time.monotonic() + 0.1
+    while time.monotonic() < deadline:
+        pass
+
+
+async def waiting_on_gemini():
+    await asyncio.sleep(1)
+
+
+async def test_sampling_profiler_collects_threads_and_tasks():
+    profiler = SamplingProfiler()
+    task = asyncio.create_task(waiting_on_gemini())
+
+    profiler.start(seconds=5, interval=0.001)
+    await asyncio.to_thread(busy_parser)
+    folded = profiler.stop()
+    task.cancel()
+
+    assert not profiler.running
+    assert profiler.samples > 0
+    assert "busy_parser (tests/test_profiling.py" in folded
+    assert "asyncio;waiting_on_gemini" in folded
+    for line in folded.splitlines():
+        assert line.rsplit(" ", 1)[1].isdigit()
+
+
+def test_memory_diff():
+    profiler = MemoryProfiler()
+    try:
+        profiler.snapshot()
+        data = [bytearray(1024) for _ in range(100)]
+        diff = profiler.diff(path="test_profiling.py")
+    finally:
+        profiler.stop()
+
+    assert data
+    assert diff["top"][0]["size_diff"] >= 100 * 1024
+    assert all("test_profiling.py" in stat["file"] for stat in diff["top"])
+
+
+@patch("app.api.deps.settings.ADMIN_TOKEN", SecretStr("secret"))
+def test_admin_api_requires_token():
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    assert client.get("/admin/memory/diff").status_code == 401
+
+    response = client.get("/admin/memory/diff", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 409
+
+
+@patch("app.api.deps.settings.ADMIN_TOKEN", SecretStr("secret"))
+def test_profiler_stop_returns_samples_and_duration():
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+    headers = {"X-Admin-Token": "secret"}
+
+    with client:
+        client.post(
+            "/admin/profiler/start",
+            params={"seconds": 5, "interval": 0.001},
+            headers=headers,
+        )
+        time.sleep(0.05)
+        response = client.post("/admin/profiler/stop", headers=headers)
+
+    assert response.status_code == 200
+    assert int(response.headers["X-Profile-Samples"]) > 0
+    assert 0.04 < float(response.headers["X-Profile-Duration"]) < 5
+
+
+@patch("app.api.deps.settings.ADMIN_TOKEN", SecretStr("secret"))
+def test_memory_endpoints_run_off_the_event_loop():
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+    headers = {"X-Admin-Token": "secret"}
+    on_loop = []
+
+    def remember_loop(**kwargs):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return {}
+
+    with patch("app.api.admin.memory_profiler") as profiler:
+        profiler.snapshot.side_effect = remember_loop
+        profiler.diff.side_effect = remember_loop
+        client.post("/admin/memory/snapshot", headers=headers)
+        client.get("/admin/memory/diff", headers=headers)
+
+    assert on_loop == [False, False]
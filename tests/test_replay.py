@@ -0,0 +1,190 @@
+import asyncio
+import gzip
+import json
+import os
+import time
+from aiogram.types import Update
+from benchmarks.documents import build_document
+from benchmarks.replay import VirtualTimeLoop, check_baseline, replay
+from app.services.parser import ContentParser
+from app.services.recording import Recorder, read_recording
+
+
+SESSION = os.path.join(os.path.dirname(__file__), "replay", "session.jsonl.gz")
+BASELINE = os.path.join(os.path.dirname(__file__), "replay", "baseline.json")
+
+UPDATE = {
+    "update_id": 1,
+    "message": {
+        "message_id": 10,
+        "date": 1760000000,
+        "chat": {"id": 555, "type": "private", "first_name": "Ivan"},
+        "from_user": {
+            "id": 555,
+            "is_bot": False,
+            "first_name": "Ivan",
+            "last_name": "Petrov",
+            "username": "ivan_p",
+        },
+        "contact": {
+            "phone_number": "+79001234567",
+            "first_name": "Ivan",
+            "user_id": 555,
+        },
+        "text": "My name is Ivan, 5 years of Python and Redis: https://hh.ru/resume/123?a=1",
+        "entities": [
+            {
+                "type": "text_link",
+                "offset": 0,
+                "length": 2,
+                "url": "https://hh.ru/resume/456",
+            }
+        ],
+        "link_preview_options": {"url": "https://hh.ru/resume/123?a=1"},
+        "document": {
+            "file_id": "BQACAgIAAxkBAAIBsecretfileid",
+            "file_unique_id": "AgADsecretunique",
+            "file_name": "Ivan Petrov CV.pdf",
+            "thumbnail": {
+                "file_id": "AAMCAgADsecretthumb",
+                "file_unique_id": "AQADsecretthumb",
+                "width": 90,
+                "height": 90,
+            },
+        },
+    },
+}
+
+
+def test_redact_update():
+    recorder = Recorder()
+    recorder.start("/dev/null")
+    recorder.stop()
+
+    redacted = recorder.redact_update(UPDATE)
+    dumped = json.dumps(redacted)
+    message = redacted["message"]
+
+    for secret in ("Ivan", "Petrov", "ivan_p", "79001234567", "resume/", "secret"):
+        assert secret not in dumped
+    assert message["chat"]["id"] != 555
+    assert message["entities"][0]["url"] == "https://hh.ru/redacted"
+    assert message["link_preview_options"]["url"] == "https://hh.ru/redacted"
+    # The same file gets the same pseudonym everywhere in the recording
+    document = message["document"]
+    assert document["file_id"] == recorder.pseudonymize("BQACAgIAAxkBAAIBsecretfileid")
+    assert document["thumbnail"]["file_id"] != document["file_id"]
+    assert document["file_name"] == "resume.pdf"
+    # The same user gets the same pseudonym everywhere, so FSM state still works
+    assert message["chat"]["id"] == message["from_user"]["id"]
+    assert message["contact"]["user_id"] == message["chat"]["id"]
+    assert message["text"] == (
+        "xx xxxx xx xxxx, 0 xxxxx xx Python xxx Redis: https://hh.ru/redacted"
+    )
+    Update.model_validate(redacted)
+
+
+def test_redact_keeps_buttons_and_commands():
+    recorder = Recorder()
+    recorder.keep_texts = {"🐍 Python Backend Developer"}
+
+    assert recorder.redact_update("🐍 Python Backend Developer", "text") == (
+        "🐍 Python Backend Developer"
+    )
+    assert recorder.redact_update("/start promo42", "text") == "/start xxxxx00"
+    assert recorder.redact_update("/start", "text") == "/start"
+    assert recorder.redact_update("Ivan CV.docx", "file_name") == "resume.docx"
+
+
+def test_recording_file(tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+    recorder = Recorder()
+    recorder.record_ai("fast", "not started", 1)
+
+    recorder.start(path)
+    recorder.record_update(UPDATE)
+    recorder.record_document("pdf", 1024, "Python developer")
+    recorder.record_url(None)
+    recorder.record_ai("strong", "Great", 2.5)
+    recorder.stop()
+    recorder.record_ai("fast", "stopped", 1)
+
+    with gzip.open(path, "rt") as file:
+        assert "Petrov" not in file.read()
+    events = list(read_recording(path))
+    assert [event["type"] for event in events] == ["update", "document", "url", "ai"]
+    assert events[1]["text"] == "Python xxxxxxxxx"
+    assert events[3] == {
+        "t": events[3]["t"],
+        "type": "ai",
+        "tier": "strong",
+        "text": "xxxxx",
+        "latency": 2.5,
+    }
+
+
+def test_build_document():
+    text = "Python xxxxxxxxx (0000)\nRedis {xx} \\ xxx"
+    for file_format in ("pdf", "docx", "rtf", "txt", "html"):
+        parsed = ContentParser.parse_document(
+            build_document(file_format, text), file_name=f"resume.{file_format}"
+        )
+        assert parsed.split() == text.split(), file_format
+    assert ContentParser.parse_document(build_document(None, text)) is None
+
+
+def test_virtual_time_loop():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        timer = asyncio.create_task(asyncio.sleep(600))
+        # A busy thread is real work: the clock must not jump while it runs
+        await asyncio.to_thread(time.sleep, 0.05)
+        in_thread = loop.time() - started
+        await timer
+        return in_thread, loop.time() - started
+
+    wall_started = time.perf_counter()
+    with asyncio.Runner(loop_factory=VirtualTimeLoop) as runner:
+        in_thread, total = runner.run(scenario())
+
+    assert 0.05 <= in_thread < 1
+    assert total >= 600
+    assert time.perf_counter() - wall_started < 1
+
+
+def test_check_baseline():
+    baseline = {
+        "latency_p95": 2.0,
+        "cpu": 10,
+        "peak_memory": 1000,
+        "updates": 3,
+        "thresholds": {"latency_p95": 0.25, "cpu": 1.0, "peak_memory": 0.1},
+    }
+    report = {"latency_p95": 2.6, "cpu": 19, "peak_memory": 1200, "updates": 3}
+
+    regressions = check_baseline(report, baseline)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("latency_p95: 2.6 > 2.0")
+    assert regressions[1].startswith("peak_memory: 1200 > 1000")
+
+
+def test_replay_within_baseline():
+    """
+    Replays the checked-in recording and fails if it got slower or fatter
+    than tests/replay/baseline.json allows (update it with `make replay-baseline`).
+    """
+    with open(BASELINE) as file:
+        baseline = json.load(file)
+    last_update = max(
+        event["t"] for event in read_recording(SESSION) if event["type"] == "update"
+    )
+
+    report = replay(SESSION)
+
+    # Recorded pauses are kept in virtual time, but cost no real time
+    assert report["duration"] >= last_update
+    assert report["wall"] < report["duration"] / 10
+    assert report["requests"]["GetFile"] > 0
+    assert check_baseline(report, baseline) == []